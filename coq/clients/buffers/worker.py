@@ -1,15 +1,26 @@
-from asyncio import create_task
-from dataclasses import dataclass
+from asyncio import create_task, sleep
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from itertools import repeat
 from os import linesep
 from pathlib import PurePath
-from typing import AsyncIterator, Iterator, Mapping, Optional, Sequence, Tuple
+from typing import (
+    AsyncIterator,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from pynvim_pp.buffer import Buffer
 from pynvim_pp.logging import suppress_and_log
+from pynvim_pp.nvim import Nvim
 from pynvim_pp.rpc_types import NvimError
 from pynvim_pp.window import Window
 
-from ...databases.buffers.database import BDB, BufferWord, Update
+from ...databases.buffers.types import PBDB, BufferWord, Update
 from ...paths.show import fmt_path
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
@@ -27,6 +38,70 @@ class _Info:
     buffers: Mapping[Buffer, int]
 
 
+@dataclass(frozen=True)
+class _Coverage:
+    tick: int
+    lo: int
+    # Characters held per chunk, `size` is their sum
+    sizes: Sequence[int]
+    size: int
+
+
+def _coverage(
+    cov: Optional[_Coverage], tick: int, line_count: int, chunk_size: int
+) -> _Coverage:
+    """
+    Resume the sweep, or restart it if the buffer changed since it finished
+
+    The change tick says nothing of where the buffer changed,
+    so any edit after a sweep finished redoes the whole buffer, from line 0
+
+    Chunks stay charged across a restart until they are redone,
+    only those past the end of the buffer are dropped
+    """
+
+    if not cov:
+        return _Coverage(tick=tick, lo=0, sizes=(), size=0)
+    else:
+        chunks = -(-line_count // chunk_size)
+        if len(cov.sizes) > chunks:
+            sizes = cov.sizes[:chunks]
+            cov = replace(cov, sizes=sizes, size=sum(sizes))
+
+        if not cov.lo:
+            return replace(cov, tick=tick)
+        elif cov.lo < line_count or cov.tick == tick:
+            return cov
+        else:
+            return replace(cov, tick=tick, lo=0)
+
+
+def _charge(
+    cov: Optional[_Coverage], lo: int, lines: Sequence[str], chunk_size: int
+) -> _Coverage:
+    """
+    Charge lines written outside of the sweep, ie. around the cursor
+
+    Each chunk they touch holds at least their share,
+    a chunk the sweep redoes is charged exactly again
+    """
+
+    # Tick is taken when the sweep starts
+    cov = cov or _Coverage(tick=0, lo=0, sizes=(), size=0)
+    shares: MutableMapping[int, int] = {}
+    for row, line in enumerate(lines, start=lo):
+        idx = row // chunk_size
+        shares[idx] = shares.get(idx, 0) + len(line)
+
+    if not shares:
+        return cov
+    else:
+        sizes = [*cov.sizes, *repeat(0, max(shares) + 1 - len(cov.sizes))]
+        for idx, share in shares.items():
+            sizes[idx] = max(sizes[idx], share)
+        return replace(cov, sizes=tuple(sizes), size=sum(sizes))
+
+
 async def _info() -> Optional[_Info]:
     try:
         win = await Window.get_current()
@@ -70,11 +145,12 @@ def _doc(client: BuffersClient, context: Context, word: BufferWord) -> Doc:
     return Doc(text=linesep.join(cont()), syntax="")
 
 
-class Worker(BaseWorker[BuffersClient, BDB]):
+class Worker(BaseWorker[BuffersClient, PBDB]):
     def __init__(
-        self, supervisor: Supervisor, options: BuffersClient, misc: BDB
+        self, supervisor: Supervisor, options: BuffersClient, misc: PBDB
     ) -> None:
         super().__init__(supervisor, options=options, misc=misc)
+        self._coverage: MutableMapping[int, _Coverage] = {}
         create_task(self._poll())
 
     async def _poll(self) -> None:
@@ -95,10 +171,71 @@ class Worker(BaseWorker[BuffersClient, BDB]):
                         hi=hi,
                         lines=info.lines,
                     )
+                    await self._index(info.buf_id, buffers=info.buffers)
 
                 async with self._supervisor.idling:
                     await self._supervisor.idling.wait()
 
+    async def _index(self, current: int, buffers: Mapping[Buffer, int]) -> None:
+        """
+        Walk the listed buffers in chunks, current one first,
+        until a completion comes in or the index budget runs out
+
+        Chunks that raced an edit are redone, as the sweep restarts on a new tick
+
+        Lines written around the cursor count against the same budget
+        """
+
+        live = {buf.number for buf in buffers}
+        for buf_id in self._coverage.keys() - live:
+            self._coverage.pop(buf_id)
+
+        chunk_size = self._options.index_chunk_size
+        ordered = sorted(buffers, key=lambda buf: (buf.number != current, buf.number))
+        with suppress(NvimError):
+            for buf in ordered:
+                line_count = buffers[buf]
+                tick = await Nvim.api.buf_get_changedtick(int, buf)
+                cov = self._coverage[buf.number] = _coverage(
+                    self._coverage.get(buf.number),
+                    tick=tick,
+                    line_count=line_count,
+                    chunk_size=chunk_size,
+                )
+                if cov.lo >= line_count:
+                    continue
+
+                filetype = await buf.filetype()
+                filename = (await buf.get_name()) or ""
+                while cov.lo < line_count:
+                    if (task := self._work_task) and not task.done():
+                        return
+
+                    idx = cov.lo // chunk_size
+                    hi = min(line_count, cov.lo + chunk_size)
+                    lines = await buf.get_lines(lo=cov.lo, hi=hi)
+                    size = sum(map(len, lines))
+                    held = cov.sizes[idx] if idx < len(cov.sizes) else 0
+                    used = sum(c.size for c in self._coverage.values())
+                    if used - held + size > self._options.index_budget:
+                        return
+
+                    await self._misc.set_lines(
+                        buf.number,
+                        filetype=filetype,
+                        filename=filename,
+                        lo=cov.lo,
+                        hi=hi,
+                        lines=lines,
+                    )
+                    cov = self._coverage[buf.number] = replace(
+                        cov,
+                        lo=hi,
+                        sizes=(*cov.sizes[:idx], size, *cov.sizes[idx + 1 :]),
+                        size=cov.size - held + size,
+                    )
+                    await sleep(self._options.index_interval)
+
     async def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
         await self._misc.buf_update(buf_id, filetype=filetype, filename=filename)
 
@@ -119,6 +256,12 @@ class Worker(BaseWorker[BuffersClient, BDB]):
             hi=hi,
             lines=lines,
         )
+        self._coverage[buf_id] = _charge(
+            self._coverage.get(buf_id),
+            lo=lo,
+            lines=lines,
+            chunk_size=self._options.index_chunk_size,
+        )
 
     async def work(self, context: Context) -> AsyncIterator[Completion]:
         async with self._work_lock:
@@ -143,6 +286,13 @@ class Worker(BaseWorker[BuffersClient, BDB]):
                 limitless=context.manual,
                 update=update,
             )
+            if update:
+                self._coverage[update.buf_id] = _charge(
+                    self._coverage.get(update.buf_id),
+                    lo=update.lo,
+                    lines=update.lines,
+                    chunk_size=self._options.index_chunk_size,
+                )
             for word in words:
                 edit = Edit(new_text=word.text)
                 cmp = Completion(
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, replace
+from dataclasses import dataclass
 from itertools import chain
 from typing import (
     AbstractSet,
@@ -16,11 +16,11 @@ from uuid import UUID, uuid4
 from ...databases.cache.database import Database
 from ...shared.fuzzy import multi_set_ratio
 from ...shared.parse import coalesce
-from ...shared.repeat import sanitize
+from ...shared.repeat import sanitize_cached
 from ...shared.runtime import Supervisor
 from ...shared.settings import MatchOptions
 from ...shared.timeit import timeit
-from ...shared.types import BaseRangeEdit, Completion, Context, Cursors
+from ...shared.types import Completion, Context
 
 
 @dataclass(frozen=True)
@@ -48,29 +48,6 @@ def _use_cache(match: MatchOptions, cache: _CacheCtx, ctx: Context) -> bool:
     return use_cache
 
 
-def _overlap(row: int, edit: BaseRangeEdit) -> bool:
-    (b_row, _), (e_row, _) = edit.begin, edit.end
-    return b_row == row or e_row == row
-
-
-def sanitize_cached(
-    cursor: Cursors, comp: Completion, sort_by: Optional[str]
-) -> Optional[Completion]:
-    if edit := sanitize(cursor, edit=comp.primary_edit):
-        row, *_ = cursor
-        cached = replace(
-            comp,
-            primary_edit=edit,
-            secondary_edits=tuple(
-                edit for edit in comp.secondary_edits if not _overlap(row, edit=edit)
-            ),
-            sort_by=sort_by or comp.sort_by,
-        )
-        return cached
-    else:
-        return None
-
-
 class CacheWorker:
     def __init__(self, supervisor: Supervisor) -> None:
         self._supervisor = supervisor
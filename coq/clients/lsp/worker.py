@@ -21,13 +21,14 @@ from ...lsp.types import LSPcomp
 from ...shared.context import cword_before
 from ...shared.fuzzy import multi_set_ratio
 from ...shared.parse import lower
+from ...shared.repeat import sanitize_cached
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
 from ...shared.settings import LSPClient, MatchOptions
 from ...shared.sql import BIGGEST_INT
 from ...shared.timeit import timeit
 from ...shared.types import Completion, Context, Edit, SnippetEdit
-from ..cache.worker import CacheWorker, sanitize_cached
+from ..cache.worker import CacheWorker
 
 _CACHE_PERIOD = 1 / 100
 _CACHE_CHUNK = 9
@@ -1,39 +1,37 @@
+from bisect import bisect_left
 from contextlib import closing, suppress
-from dataclasses import dataclass
-from itertools import islice
+from hashlib import blake2b
+from itertools import count, islice
 from random import shuffle
 from sqlite3 import Connection, OperationalError
 from sqlite3.dbapi2 import Cursor
-from typing import AbstractSet, Iterator, Mapping, Optional, Sequence, Tuple
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from uuid import uuid4
 
-from pynvim_pp.lib import recode
+from pynvim_pp.lib import encode, recode
 
 from ...consts import BUFFER_DB, DEBUG
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.parse import coalesce
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
+from ..ngrams.index import NGramIndex, init_ngrams
 from ..types import Interruptible
+from .positions import extend, respace, spread
 from .sql import sql
+from .types import BufferWord, Update
 
-
-@dataclass(frozen=True)
-class Update:
-    buf_id: int
-    filetype: str
-    filename: str
-    lo: int
-    hi: int
-    lines: Sequence[str]
-
-
-@dataclass(frozen=True)
-class BufferWord:
-    text: str
-    filetype: str
-    filename: str
-    line_num: int
+# Hash of lines whose words are not all written yet, matches no line
+_PARTIAL = b""
 
 
 def _ensure_buffer(cursor: Cursor, buf_id: int, filetype: str, filename: str) -> None:
@@ -49,8 +47,46 @@ def _ensure_buffer(cursor: Cursor, buf_id: int, filetype: str, filename: str) ->
         cursor.execute(sql("insert", "buffer"), row)
 
 
+def _line_hash(line: str) -> bytes:
+    return blake2b(encode(line), digest_size=16).digest()
+
+
+def _rebalance(
+    cursor: Cursor,
+    positions: MutableSequence[int],
+    buf_id: int,
+    lo: int,
+    hi: int,
+    n: int,
+) -> None:
+    """
+    Move the rows of the window `respace` picks to their new positions
+    """
+
+    a, spaced = respace(positions, lo=lo, hi=hi, n=n)
+    b = a + len(spaced)
+    cursor.execute(
+        sql("select", "line_positions"),
+        {"buffer_id": buf_id, "lo": positions[a], "hi": positions[b - 1] + 1},
+    )
+    rows = cursor.fetchall()
+    cursor.executemany(
+        sql("update", "line_pos"),
+        (
+            {
+                "rowid": row["rowid"],
+                "pos": spaced[bisect_left(positions, row["pos"]) - a],
+            }
+            for row in rows
+        ),
+    )
+    positions[a:b] = spaced
+
+
 def _setlines(
     cursor: Cursor,
+    ngrams: NGramIndex,
+    positions: MutableSequence[int],
     unifying_chars: AbstractSet[str],
     tokenization_limit: int,
     include_syms: bool,
@@ -61,32 +97,16 @@ def _setlines(
     hi: int,
     lines: Sequence[str],
 ) -> None:
-    def m0() -> Iterator[Tuple[int, str, bytes]]:
-        for line_num, line in enumerate(lines, start=lo):
-            line_id = uuid4().bytes
-            yield line_num, recode(line), line_id
-
-    line_info = [*m0()]
-    shuffle(line_info)
+    """
+    Lines are content addressed, unchanged lines keep their row and words,
+    only new lines are tokenized
 
-    def m1() -> Iterator[Mapping]:
-        for line_num, line, line_id in line_info:
-            yield {
-                "rowid": line_id,
-                "buffer_id": buf_id,
-                "line_num": line_num,
-                "line": line if DEBUG else "",
-            }
+    A line is only hashed once all its words are written, lines cut short by
+    `tokenization_limit` or an interrupt are tokenized again on the next send
 
-    def m2() -> Iterator[Mapping]:
-        for line_num, line, line_id in line_info:
-            for word in coalesce(
-                unifying_chars,
-                include_syms=include_syms,
-                backwards=None,
-                chars=line,
-            ):
-                yield {"line_id": line_id, "word": word, "line_num": line_num}
+    Rows are ordered by a sparse `pos`, `positions` holds it for every line
+    slot of the buffer, so only the rows in [lo, hi) are ever written
+    """
 
     _ensure_buffer(
         cursor,
@@ -94,24 +114,100 @@ def _setlines(
         filetype=filetype,
         filename=filename,
     )
+
+    hi = max(lo, len(positions)) if hi < 0 else hi
+    extend(positions, hi=max(lo, hi))
+
+    def bounds() -> Tuple[Optional[int], Optional[int]]:
+        left = positions[lo - 1] if lo else None
+        right = positions[hi] if hi < len(positions) else None
+        return left, right
+
+    left, right = bounds()
+    if (spaced := spread(left, right=right, n=len(lines))) is None:
+        _rebalance(
+            cursor, positions=positions, buf_id=buf_id, lo=lo, hi=hi, n=len(lines)
+        )
+        left, right = bounds()
+        spaced = spread(left, right=right, n=len(lines))
+        assert spaced is not None
+
     cursor.execute(
-        sql("delete", "lines"),
-        {"buffer_id": buf_id, "lo": lo, "hi": hi},
+        sql("select", "line_hashes"),
+        {
+            "buffer_id": buf_id,
+            "lo": -BIGGEST_INT if left is None else left + 1,
+            "hi": BIGGEST_INT if right is None else right,
+        },
     )
-    shift = len(lines) - (hi - lo)
-    cursor.execute(
-        sql("update", "lines_shift_1"),
-        {"buffer_id": buf_id, "lo": lo, "shift": shift},
+    existing: MutableMapping[bytes, MutableSequence[bytes]] = {}
+    for row in cursor.fetchall():
+        existing.setdefault(row["line_hash"], []).append(row["rowid"])
+
+    moved: MutableSequence[Mapping] = []
+    new_lines: MutableSequence[Tuple[int, str, bytes, bytes]] = []
+    for line_num, pos, line in zip(count(lo), spaced, lines):
+        line_hash = _line_hash(line)
+        if rowids := existing.get(line_hash):
+            moved.append({"rowid": rowids.pop(), "pos": pos})
+        else:
+            new_lines.append((line_num, recode(line), line_hash, uuid4().bytes))
+
+    positions[lo:hi] = spaced
+    shuffle(new_lines)
+
+    def m1() -> Iterator[Mapping]:
+        for line_num, line, _, line_id in new_lines:
+            yield {
+                "rowid": line_id,
+                "buffer_id": buf_id,
+                "pos": positions[line_num],
+                "line_hash": _PARTIAL,
+                "line": line if DEBUG else "",
+            }
+
+    words: MutableSequence[Mapping] = []
+    hashes: MutableSequence[Mapping] = []
+    limit = max(0, tokenization_limit)
+    for _, line, line_hash, line_id in new_lines:
+        tokens = [
+            *islice(
+                coalesce(
+                    unifying_chars,
+                    include_syms=include_syms,
+                    backwards=None,
+                    chars=line,
+                ),
+                limit + 1,
+            )
+        ]
+        if len(tokens) <= limit:
+            hashes.append({"rowid": line_id, "line_hash": line_hash})
+        words.extend({"line_id": line_id, "word": word} for word in tokens[:limit])
+        limit = max(0, limit - len(tokens))
+
+    cursor.executemany(
+        sql("delete", "line"),
+        ({"rowid": rowid} for rowids in existing.values() for rowid in rowids),
     )
-    cursor.execute(sql("update", "lines_shift_2"), {"buffer_id": buf_id})
+    cursor.executemany(sql("update", "line_pos"), moved)
     cursor.executemany(sql("insert", "line"), m1())
-    cursor.executemany(sql("insert", "word"), islice(m2(), tokenization_limit))
-    cursor.execute(sql("select", "line_count"), {"buffer_id": buf_id})
-    count = cursor.fetchone()["line_count"]
-    if not count:
+    cursor.executemany(sql("insert", "word"), words)
+    ngrams.index(cursor, words=(row["word"] for row in words))
+    cursor.executemany(sql("update", "line_hash"), hashes)
+    cursor.execute(sql("select", "has_lines"), {"buffer_id": buf_id})
+    if not cursor.fetchone()["has_lines"]:
+        if not positions:
+            positions.append(0)
         cursor.execute(
             sql("insert", "line"),
-            {"rowid": uuid4().bytes, "line": "", "buffer_id": buf_id, "line_num": 0},
+            {
+                "rowid": uuid4().bytes,
+                "line": "",
+                "line_hash": _line_hash(""),
+                "buffer_id": buf_id,
+                "pos": positions[0],
+            },
         )
 
 
@@ -120,6 +216,7 @@ def _init() -> Connection:
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
     conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
     return conn
 
 
@@ -130,10 +227,12 @@ class BDB(Interruptible):
         unifying_chars: AbstractSet[str],
         include_syms: bool,
     ) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
         self._tokenization_limit = tokenization_limit
         self._unifying_chars = unifying_chars
         self._include_syms = include_syms
+        self._ngrams = NGramIndex()
+        self._positions: MutableMapping[int, MutableSequence[int]] = {}
         self._conn: Connection = self._ex.ssubmit(_init)
 
     async def vacuum(self, live_bufs: Mapping[int, int]) -> None:
@@ -146,17 +245,22 @@ class BDB(Interruptible):
                     sql("delete", "buffer"),
                     ({"buffer_id": buf_id} for buf_id in dead),
                 )
-                cursor.executemany(
-                    sql("delete", "lines"),
-                    (
-                        {"buffer_id": buf_id, "lo": line_count, "hi": -1}
-                        for buf_id, line_count in live_bufs.items()
-                    ),
-                )
+                for buf_id in dead:
+                    self._positions.pop(buf_id, None)
+
+                for buf_id, line_count in live_bufs.items():
+                    positions = self._positions.get(buf_id, ())
+                    if line_count < len(positions):
+                        cursor.execute(
+                            sql("delete", "lines"),
+                            {"buffer_id": buf_id, "lo": positions[line_count]},
+                        )
+                        del self._positions[buf_id][line_count:]
+                self._ngrams.prune(cursor)
                 cursor.execute("PRAGMA optimize", ())
 
         with suppress(OperationalError):
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
         def cont() -> None:
@@ -169,7 +273,7 @@ class BDB(Interruptible):
                 )
 
         async with self._lock:
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def set_lines(
         self,
@@ -184,6 +288,8 @@ class BDB(Interruptible):
             with self._conn, closing(self._conn.cursor()) as cursor:
                 _setlines(
                     cursor,
+                    ngrams=self._ngrams,
+                    positions=self._positions.setdefault(buf_id, []),
                     unifying_chars=self._unifying_chars,
                     tokenization_limit=self._tokenization_limit,
                     include_syms=self._include_syms,
@@ -196,7 +302,7 @@ class BDB(Interruptible):
                 )
 
         with suppress(OperationalError):
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def words(
         self,
@@ -212,6 +318,8 @@ class BDB(Interruptible):
                 if update:
                     _setlines(
                         cursor,
+                        ngrams=self._ngrams,
+                        positions=self._positions.setdefault(update.buf_id, []),
                         unifying_chars=self._unifying_chars,
                         tokenization_limit=self._tokenization_limit,
                         include_syms=self._include_syms,
@@ -223,6 +331,7 @@ class BDB(Interruptible):
                         lines=update.lines,
                     )
 
+                self._ngrams.hits(cursor, opts=opts, word=word, sym=sym)
                 cursor.execute(
                     sql("select", "words"),
                     {
@@ -236,16 +345,17 @@ class BDB(Interruptible):
                         "like_sym": like_esc(sym[: opts.exact_matches]),
                     },
                 )
-                rows = cursor.fetchall()
-                return (
-                    BufferWord(
+                acc: MutableSequence[BufferWord] = []
+                for row in cursor.fetchall():
+                    positions = self._positions.get(row["buffer_id"], ())
+                    buf_word = BufferWord(
                         text=row["word"],
                         filetype=row["filetype"],
                         filename=row["filename"],
-                        line_num=row["line_num"] + 1,
+                        line_num=bisect_left(positions, row["pos"]) + 1,
                     )
-                    for row in rows
-                )
+                    acc.append(buf_word)
+                return iter(acc)
 
         async with self._interruption():
             try:
@@ -0,0 +1,349 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice, repeat
+from random import shuffle
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ...shared.executor import DBExecutor
+from ...shared.fuzzy import profiled_ratio, query_profile
+from ...shared.parse import coalesce
+from ...shared.settings import MatchOptions
+from ..ngrams.index import min_grams, ngrams, sql_lower
+from .positions import extend, respace, spread
+from .types import BufferWord, Update
+
+
+class _Buffer:
+    __slots__ = ("filetype", "filename", "lines", "positions")
+
+    def __init__(self, filetype: str, filename: str) -> None:
+        self.filetype, self.filename = filetype, filename
+        # `None` for line slots that were never sent
+        self.lines: MutableSequence[Optional[_Line]] = []
+        # Sparse order key of every slot, as in `BDB`
+        self.positions: MutableSequence[int] = []
+
+
+class _Line:
+    __slots__ = ("buf", "pos", "text", "words")
+
+    def __init__(
+        self, buf: _Buffer, pos: int, text: Optional[str], words: AbstractSet[str]
+    ) -> None:
+        # `text` is `None` until all its words are in, so it is never reused
+        self.buf, self.pos, self.text, self.words = buf, pos, text, words
+
+
+class _Bank:
+    """
+    `words` posts each word to the lines it is on,
+    `sorted` holds their `lword`s for prefix bisection,
+    `grams` posts each n-gram to the `lword`s containing it
+    """
+
+    def __init__(self) -> None:
+        self.words: MutableMapping[str, MutableSet[_Line]] = {}
+        self.lwords: MutableMapping[str, MutableSet[str]] = {}
+        self.sorted: MutableSequence[str] = []
+        self.grams: MutableMapping[str, MutableSet[str]] = {}
+
+    def add(self, line: _Line) -> None:
+        for word in line.words:
+            if (lines := self.words.get(word)) is None:
+                lines = self.words[word] = set()
+                lword = sql_lower(word)
+                if (same := self.lwords.get(lword)) is None:
+                    same = self.lwords[lword] = set()
+                    insort(self.sorted, lword)
+                    for gram in ngrams(lword):
+                        self.grams.setdefault(gram, set()).add(lword)
+                same.add(word)
+            lines.add(line)
+
+    def remove(self, line: _Line) -> None:
+        for word in line.words:
+            lines = self.words[word]
+            lines.discard(line)
+            if not lines:
+                self.words.pop(word)
+                lword = sql_lower(word)
+                same = self.lwords[lword]
+                same.discard(word)
+                if not same:
+                    self.lwords.pop(lword)
+                    del self.sorted[bisect_left(self.sorted, lword)]
+                    for gram in ngrams(lword):
+                        lwords = self.grams[gram]
+                        lwords.discard(lword)
+                        if not lwords:
+                            self.grams.pop(gram)
+
+    def prefixed(self, prefix: str) -> Iterator[str]:
+        for idx in range(bisect_left(self.sorted, prefix), len(self.sorted)):
+            if (lword := self.sorted[idx]).startswith(prefix):
+                yield lword
+            else:
+                break
+
+    def hits(self, opts: MatchOptions, query: str) -> Iterator[str]:
+        if (n_grams := min_grams(opts, query=query)) is not None:
+            counts = Counter(
+                lword for gram in ngrams(query) for lword in self.grams.get(gram, ())
+            )
+            for lword, count in counts.items():
+                if count >= n_grams:
+                    yield lword
+
+
+def _matches(
+    opts: MatchOptions,
+    hits: AbstractSet[str],
+    query: str,
+    word: str,
+    lword: str,
+) -> bool:
+    """
+    Same filter as `sql/select/words.sql`
+    """
+
+    return (
+        (lword.startswith(sql_lower(query[: opts.exact_matches])) or lword in hits)
+        and len(word) + opts.look_ahead >= len(query)
+        and word != query[: len(word)]
+        and profiled_ratio(
+            query_profile(sql_lower(query)), rhs=lword, look_ahead=opts.look_ahead
+        )
+        > opts.fuzzy_cutoff
+    )
+
+
+class MemoryBDB:
+    """
+    `BDB` in plain Python structures, no SQL on the completion path
+
+    Buffers are lists of line slots, each line holds its own word set
+    """
+
+    def __init__(
+        self,
+        tokenization_limit: int,
+        unifying_chars: AbstractSet[str],
+        include_syms: bool,
+    ) -> None:
+        self._ex = DBExecutor()
+        self._tokenization_limit = tokenization_limit
+        self._unifying_chars = unifying_chars
+        self._include_syms = include_syms
+        self._buffers: MutableMapping[int, _Buffer] = {}
+        self._bank = _Bank()
+
+    def _buffer(self, buf_id: int, filetype: str, filename: str) -> _Buffer:
+        if buf := self._buffers.get(buf_id):
+            buf.filetype, buf.filename = filetype, filename
+        else:
+            buf = self._buffers[buf_id] = _Buffer(filetype, filename=filename)
+        return buf
+
+    def _drop(self, buf: _Buffer, lo: int) -> None:
+        for line in buf.lines[lo:]:
+            if line:
+                self._bank.remove(line)
+        del buf.lines[lo:]
+        del buf.positions[lo:]
+
+    def _set_lines(
+        self,
+        buf_id: int,
+        filetype: str,
+        filename: str,
+        lo: int,
+        hi: int,
+        lines: Sequence[str],
+    ) -> None:
+        """
+        Unchanged lines in [lo, hi) are reused, only new lines are tokenized,
+        lines cut short by `tokenization_limit` are tokenized again
+        """
+
+        buf = self._buffer(buf_id, filetype=filetype, filename=filename)
+        hi = max(lo, len(buf.lines)) if hi < 0 else hi
+        if (missing := max(lo, hi) - len(buf.lines)) > 0:
+            buf.lines.extend(repeat(None, missing))
+            extend(buf.positions, hi=len(buf.lines))
+
+        def bounds() -> Tuple[Optional[int], Optional[int]]:
+            left = buf.positions[lo - 1] if lo else None
+            right = buf.positions[hi] if hi < len(buf.positions) else None
+            return left, right
+
+        if (spaced := spread(*bounds(), n=len(lines))) is None:
+            a, respaced = respace(buf.positions, lo=lo, hi=hi, n=len(lines))
+            for line, pos in zip(buf.lines[a : a + len(respaced)], respaced):
+                if line:
+                    line.pos = pos
+            buf.positions[a : a + len(respaced)] = respaced
+            spaced = spread(*bounds(), n=len(lines))
+            assert spaced is not None
+
+        existing: MutableMapping[Optional[str], MutableSequence[_Line]] = {}
+        for line in buf.lines[lo:hi]:
+            if line:
+                existing.setdefault(line.text, []).append(line)
+
+        new_lines: MutableSequence[int] = []
+        acc: MutableSequence[Optional[_Line]] = []
+        for idx, (pos, text) in enumerate(zip(spaced, lines)):
+            if reused := existing.get(text):
+                line = reused.pop()
+                line.pos = pos
+                acc.append(line)
+            else:
+                new_lines.append(idx)
+                acc.append(None)
+
+        shuffle(new_lines)
+        limit = max(0, self._tokenization_limit)
+        for idx in new_lines:
+            text = lines[idx]
+            words = [
+                *islice(
+                    coalesce(
+                        self._unifying_chars,
+                        include_syms=self._include_syms,
+                        backwards=None,
+                        chars=text,
+                    ),
+                    limit + 1,
+                )
+            ]
+            done = len(words) <= limit
+            acc[idx] = line = _Line(
+                buf,
+                pos=spaced[idx],
+                text=text if done else None,
+                words=frozenset(words[:limit]),
+            )
+            limit = max(0, limit - len(words))
+            self._bank.add(line)
+
+        for unmatched in existing.values():
+            for line in unmatched:
+                self._bank.remove(line)
+
+        buf.lines[lo:hi] = acc
+        buf.positions[lo:hi] = spaced
+
+    def _words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limitless: int,
+    ) -> Iterator[BufferWord]:
+        queries = tuple(query for query in (word, sym) if query)
+        hits = {lword for query in queries for lword in self._bank.hits(opts, query)}
+        candidates = {*hits}
+        for query in queries:
+            prefix = sql_lower(query[: opts.exact_matches])
+            candidates.update(self._bank.prefixed(prefix))
+
+        def cont() -> Iterator[BufferWord]:
+            for lword in candidates:
+                for text in self._bank.lwords[lword]:
+                    if not any(
+                        _matches(opts, hits=hits, query=query, word=text, lword=lword)
+                        for query in queries
+                    ):
+                        continue
+                    elif line := next(
+                        (
+                            on
+                            for on in self._bank.words[text]
+                            if filetype is None or on.buf.filetype == filetype
+                        ),
+                        None,
+                    ):
+                        buf = line.buf
+                        yield BufferWord(
+                            text=text,
+                            filetype=buf.filetype,
+                            filename=buf.filename,
+                            line_num=bisect_left(buf.positions, line.pos) + 1,
+                        )
+
+        limit = None if limitless else opts.max_results
+        return iter([*islice(cont(), limit)])
+
+    async def vacuum(self, live_bufs: Mapping[int, int]) -> None:
+        def cont() -> None:
+            for buf_id in self._buffers.keys() - live_bufs.keys():
+                self._drop(self._buffers.pop(buf_id), lo=0)
+
+            for buf_id, line_count in live_bufs.items():
+                if (buf := self._buffers.get(buf_id)) and line_count < len(buf.lines):
+                    self._drop(buf, lo=line_count)
+
+        await self._ex.background(cont)
+
+    async def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
+        def cont() -> None:
+            self._buffer(buf_id, filetype=filetype, filename=filename)
+
+        await self._ex.background(cont)
+
+    async def set_lines(
+        self,
+        buf_id: int,
+        filetype: str,
+        filename: str,
+        lo: int,
+        hi: int,
+        lines: Sequence[str],
+    ) -> None:
+        def cont() -> None:
+            self._set_lines(
+                buf_id,
+                filetype=filetype,
+                filename=filename,
+                lo=lo,
+                hi=hi,
+                lines=lines,
+            )
+
+        await self._ex.background(cont)
+
+    async def words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limitless: int,
+        update: Optional[Update],
+    ) -> Iterator[BufferWord]:
+        def cont() -> Iterator[BufferWord]:
+            if update:
+                self._set_lines(
+                    update.buf_id,
+                    filetype=update.filetype,
+                    filename=update.filename,
+                    lo=update.lo,
+                    hi=update.hi,
+                    lines=update.lines,
+                )
+            return self._words(
+                opts, filetype=filetype, word=word, sym=sym, limitless=limitless
+            )
+
+        return await self._ex.submit(cont)
@@ -0,0 +1,49 @@
+from typing import MutableSequence, Optional, Sequence, Tuple
+
+GAP = 2**32
+_MIN_STEP = 2**16
+
+
+def extend(positions: MutableSequence[int], hi: int) -> None:
+    """
+    Append evenly spaced slots up to `hi`
+    """
+
+    if (missing := hi - len(positions)) > 0:
+        start = positions[-1] + GAP if positions else 0
+        positions.extend(range(start, start + missing * GAP, GAP))
+
+
+def spread(left: Optional[int], right: Optional[int], n: int) -> Optional[range]:
+    """
+    `n` evenly spaced positions strictly between `left` and `right`,
+    `None` if the gap is too narrow
+    """
+
+    if left is None:
+        left = (0 if right is None else right) - (n + 1) * GAP
+    if right is None:
+        right = left + (n + 1) * GAP
+
+    step = (right - left) // (n + 1)
+    return range(left + step, left + step * (n + 1), step) if step else None
+
+
+def respace(positions: Sequence[int], lo: int, hi: int, n: int) -> Tuple[int, range]:
+    """
+    Even spacing for a window of line slots around [lo, hi),
+    doubled until there is room for `n` lines and then some
+
+    Returns where the window starts, and its new positions
+    """
+
+    a, b, width = lo - 1, hi + 1, 1
+    while True:
+        left = positions[a - 1] if a else None
+        right = positions[b] if b < len(positions) else None
+        spaced = spread(left, right=right, n=b - a)
+        if spaced and spaced.step >= _MIN_STEP and spaced.step * (hi - lo + 1) > n:
+            return a, spaced
+        else:
+            a, b = max(0, a - width), min(len(positions), b + width)
+            width *= 2
@@ -12,12 +12,12 @@ CREATE INDEX IF NOT EXISTS buffers_filetype ON buffers (filetype);
 CREATE TABLE IF NOT EXISTS lines (
   rowid     BLOB    NOT NULL PRIMARY KEY,
   buffer_id INTEGER NOT NULL REFERENCES buffers (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
-  line_num  INTEGER NOT NULL,
-  line      TEXT    NOT NULL,
-  UNIQUE(buffer_id, line_num)
+  -- Sparse order key, line numbers are kept in memory
+  pos       INTEGER NOT NULL,
+  line_hash BLOB    NOT NULL,
+  line      TEXT    NOT NULL
 ) WITHOUT ROWID;
-CREATE INDEX IF NOT EXISTS lines_buffer_id ON lines (buffer_id);
-CREATE INDEX IF NOT EXISTS lines_line_num  ON lines (line_num);
+CREATE INDEX IF NOT EXISTS lines_buffer_id_pos ON lines (buffer_id, pos);
 
 
 CREATE TABLE IF NOT EXISTS words (
@@ -28,25 +28,61 @@ CREATE TABLE IF NOT EXISTS words (
 );
 CREATE INDEX IF NOT EXISTS words_line_id ON words (line_id);
 CREATE INDEX IF NOT EXISTS words_word    ON words (word);
-CREATE INDEX IF NOT EXISTS words_lword   ON words (lword);
 
 
-CREATE VIEW IF NOT EXISTS words_view AS
+-- Materialized `SELECT DISTINCT word FROM words`, kept by the triggers below
+CREATE TABLE IF NOT EXISTS unique_words (
+  word     TEXT    NOT NULL PRIMARY KEY,
+  lword    TEXT    NOT NULL COLLATE NOCASE,
+  refcount INTEGER NOT NULL,
+  -- Any one line the word is on
+  line_id  BLOB    NOT NULL
+) WITHOUT ROWID;
+-- `NOCASE` lets prefix `LIKE`s use the index
+CREATE INDEX IF NOT EXISTS unique_words_lword ON unique_words (lword);
+
+
+CREATE TRIGGER IF NOT EXISTS words_insert AFTER INSERT ON words
+WHEN new.word <> ''
+BEGIN
+  INSERT INTO unique_words ( word,     lword,     refcount, line_id)
+  VALUES                   (new.word, new.lword, 1,        new.line_id)
+  ON CONFLICT (word) DO UPDATE SET refcount = refcount + 1;
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS words_delete AFTER DELETE ON words
+WHEN old.word <> ''
+BEGIN
+  DELETE FROM unique_words
+  WHERE
+    word = old.word
+    AND
+    refcount <= 1;
+  UPDATE unique_words
+  SET
+    refcount = refcount - 1,
+    line_id  = CASE
+      WHEN line_id = old.line_id THEN (
+        SELECT
+          line_id
+        FROM words
+        WHERE
+          word = old.word
+        LIMIT 1
+      )
+      ELSE line_id
+    END
+  WHERE
+    word = old.word;
+END;
+
+
+-- `lword`s the n-gram index keeps postings for
+CREATE VIEW IF NOT EXISTS ngram_lwords AS
 SELECT
-  words.word,
-  words.lword,
-  buffers.filetype,
-  buffers.filename,
-  lines.line_num
-FROM buffers
-JOIN lines
-  ON lines.buffer_id = buffers.rowid
-JOIN words
-  ON words.line_id = lines.rowid
-GROUP BY
-  words.word
-HAVING
-  words.word <> '';
+  lword
+FROM unique_words;
 
 
 END;
@@ -1,3 +1,2 @@
-INSERT INTO lines ( rowid,  buffer_id,  line_num,  line)
-VALUES            (:rowid, :buffer_id, :line_num, :line)
-
+INSERT INTO lines ( rowid,  buffer_id,  pos,  line_hash,  line)
+VALUES            (:rowid, :buffer_id, :pos, :line_hash, :line)
@@ -0,0 +1,8 @@
+SELECT
+  EXISTS (
+    SELECT
+      1
+    FROM lines
+    WHERE
+      buffer_id = :buffer_id
+  ) AS has_lines
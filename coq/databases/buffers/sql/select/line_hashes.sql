@@ -0,0 +1,10 @@
+SELECT
+  rowid,
+  line_hash
+FROM lines
+WHERE
+  buffer_id = :buffer_id
+  AND
+  pos >= :lo
+  AND
+  pos < :hi
@@ -0,0 +1,10 @@
+SELECT
+  rowid,
+  pos
+FROM lines
+WHERE
+  buffer_id = :buffer_id
+  AND
+  pos >= :lo
+  AND
+  pos < :hi
@@ -1,20 +1,58 @@
-SELECT
-  word,
-  filetype,
-  filename,
-  line_num
-FROM words_view
-WHERE
-  CASE
-    WHEN :filetype <> NULL THEN filetype = :filetype
-    ELSE 1
-  END
-  AND
+WITH candidates (lword) AS (
+  SELECT
+    lword
+  FROM unique_words
+  WHERE
+    :word <> ''
+    AND
+    lword LIKE :like_word ESCAPE '!'
+  UNION
+  SELECT
+    lword
+  FROM unique_words
+  WHERE
+    :sym <> ''
+    AND
+    lword LIKE :like_sym ESCAPE '!'
+  UNION
+  SELECT
+    lword
+  FROM ngram_hits
+),
+matches (word, line_id) AS (
+  SELECT
+    word,
+    -- A line in a buffer of `:filetype`, `NULL` if there is none
+    CASE
+      WHEN :filetype IS NULL THEN line_id
+      ELSE (
+        SELECT
+          words.line_id
+        FROM words
+        JOIN lines
+          ON lines.rowid = words.line_id
+        JOIN buffers
+          ON buffers.rowid = lines.buffer_id
+        WHERE
+          words.word = unique_words.word
+          AND
+          buffers.filetype = :filetype
+        LIMIT 1
+      )
+    END
+  FROM unique_words
+  WHERE
+    lword IN (SELECT lword FROM candidates)
+    AND
   (
     (
       :word <> ''
       AND
-      lword LIKE :like_word ESCAPE '!'
+      (
+        lword LIKE :like_word ESCAPE '!'
+        OR
+        lword IN (SELECT lword FROM ngram_hits)
+      )
       AND
       LENGTH(word) + :look_ahead >= LENGTH(:word)
       AND
@@ -26,7 +64,11 @@ WHERE
     (
       :sym <> ''
       AND
-      lword LIKE :like_sym ESCAPE '!'
+      (
+        lword LIKE :like_sym ESCAPE '!'
+        OR
+        lword IN (SELECT lword FROM ngram_hits)
+      )
       AND
       LENGTH(word) + :look_ahead >= LENGTH(:sym)
       AND
@@ -35,4 +77,16 @@ WHERE
       X_SIMILARITY(LOWER(:sym), lword, :look_ahead) > :cut_off
     )
   )
+)
+SELECT
+  matches.word,
+  buffers.filetype,
+  buffers.filename,
+  buffers.rowid AS buffer_id,
+  lines.pos
+FROM matches
+JOIN lines
+  ON lines.rowid = matches.line_id
+JOIN buffers
+  ON buffers.rowid = lines.buffer_id
 LIMIT :limit
@@ -0,0 +1,5 @@
+UPDATE lines
+SET
+  line_hash = :line_hash
+WHERE
+  rowid = :rowid
@@ -0,0 +1,5 @@
+UPDATE lines
+SET
+  pos = :pos
+WHERE
+  rowid = :rowid
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Iterator, Mapping, Optional, Protocol, Sequence
+
+from ...shared.settings import MatchOptions
+
+
+@dataclass(frozen=True)
+class Update:
+    buf_id: int
+    filetype: str
+    filename: str
+    lo: int
+    hi: int
+    lines: Sequence[str]
+
+
+@dataclass(frozen=True)
+class BufferWord:
+    text: str
+    filetype: str
+    filename: str
+    line_num: int
+
+
+class PBDB(Protocol):
+    """
+    Word bank of the buffers source, see `clients.buffers.backend`
+    """
+
+    async def vacuum(self, live_bufs: Mapping[int, int]) -> None:
+        ...
+
+    async def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
+        ...
+
+    async def set_lines(
+        self,
+        buf_id: int,
+        filetype: str,
+        filename: str,
+        lo: int,
+        hi: int,
+        lines: Sequence[str],
+    ) -> None:
+        ...
+
+    async def words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limitless: int,
+        update: Optional[Update],
+    ) -> Iterator[BufferWord]:
+        ...
@@ -2,9 +2,10 @@ from contextlib import closing, suppress
 from sqlite3 import Connection, OperationalError
 from typing import Iterable, Iterator, Mapping, Tuple
 
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
+from ..ngrams.index import NGramIndex, init_ngrams
 from ..types import Interruptible
 from .sql import sql
 
@@ -14,12 +15,14 @@ def _init() -> Connection:
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
     conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
     return conn
 
 
 class Database(Interruptible):
     def __init__(self) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
+        self._ngrams = NGramIndex()
         self._conn: Connection = self._ex.ssubmit(_init)
 
     async def insert(self, keys: Iterable[Tuple[bytes, str]]) -> None:
@@ -29,10 +32,12 @@ class Database(Interruptible):
 
         def cont() -> None:
             with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.executemany(sql("insert", "word"), m1())
+                words = [*m1()]
+                cursor.executemany(sql("insert", "word"), words)
+                self._ngrams.index(cursor, words=(row["word"] for row in words))
 
         with suppress(OperationalError):
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def select(
         self, clear: bool, opts: MatchOptions, word: str, sym: str, limitless: int
@@ -41,11 +46,13 @@ class Database(Interruptible):
             if clear:
                 with self._conn, closing(self._conn.cursor()) as cursor:
                     cursor.execute(sql("delete", "words"))
+                    self._ngrams.clear(cursor)
                     return iter(()), 0
             else:
                 try:
                     with self._conn, closing(self._conn.cursor()) as cursor:
                         limit = BIGGEST_INT if limitless else opts.max_results
+                        self._ngrams.hits(cursor, opts=opts, word=word, sym=sym)
                         cursor.execute(
                             sql("select", "words"),
                             {
@@ -7,7 +7,11 @@ WHERE
   AND
   (
     (
-      lword LIKE :like_word ESCAPE '!'
+      (
+        lword LIKE :like_word ESCAPE '!'
+        OR
+        lword IN (SELECT lword FROM ngram_hits)
+      )
       AND
       LENGTH(word) + :look_ahead >= LENGTH(:word)
       AND
@@ -17,7 +21,11 @@ WHERE
     )
     OR
     (
-      lword LIKE :like_sym ESCAPE '!'
+      (
+        lword LIKE :like_sym ESCAPE '!'
+        OR
+        lword IN (SELECT lword FROM ngram_hits)
+      )
       AND
       LENGTH(word) + :look_ahead >= LENGTH(:sym)
       AND
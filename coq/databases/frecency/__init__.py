@@ -0,0 +1,3 @@
+"""
+This file defines frecency as a submodule of databases/coq.
+"""
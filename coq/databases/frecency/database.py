@@ -0,0 +1,127 @@
+from asyncio import create_task
+from contextlib import closing, suppress
+from pathlib import Path
+from sqlite3 import Connection, OperationalError
+from time import time
+from types import MappingProxyType
+from typing import Mapping, MutableMapping, Sequence, Tuple
+
+from ...shared.executor import DBExecutor
+from ...shared.sql import init_db
+from ..types import Interruptible
+from .sql import sql
+
+_SCHEMA = "v1"
+
+_HALF_LIFE = 3 * 24 * 60 * 60
+_SIZE = 999
+_SLACK = 99
+_MIN_SCORE = 2**-10
+
+
+def _init(db_dir: Path) -> Connection:
+    db = (db_dir / f"frecency-{_SCHEMA}").with_suffix(".sqlite3")
+    db.parent.mkdir(parents=True, exist_ok=True)
+    conn = Connection(str(db), isolation_level=None)
+    init_db(conn)
+    conn.executescript(sql("create", "pragma"))
+    conn.executescript(sql("create", "tables"))
+    return conn
+
+
+class FDB(Interruptible):
+    """
+    Exponentially decayed insertion counts, persisted across sessions
+
+    In memory, scores are scaled by `2 ** ((t - t0) / half life)`,
+    a common factor, so existing entries never need to decay
+
+    The in memory scores are replaced, never mutated, on write,
+    so every `scores()` is a snapshot
+    """
+
+    def __init__(self, vars_dir: Path) -> None:
+        self._ex = DBExecutor()
+        self._t0 = time()
+        self._scores: Mapping[str, float] = {}
+        db_dir = vars_dir / "frecency"
+        self._conn: Connection = self._ex.ssubmit(lambda: _init(db_dir))
+        self._loaded = create_task(self._load())
+
+    def _scale(self, now: float) -> float:
+        return 2 ** ((now - self._t0) / _HALF_LIFE)
+
+    async def _load(self) -> None:
+        def cont() -> Sequence[Tuple[str, float, float]]:
+            with suppress(OperationalError):
+                with self._conn, closing(self._conn.cursor()) as cursor:
+                    cursor.execute(sql("select", "frecency"), ())
+                    return [
+                        (row["sort_by"], row["score"], row["mtime"])
+                        for row in cursor.fetchall()
+                    ]
+            return ()
+
+        async with self._lock:
+            rows = await self._ex.background(cont)
+
+        scores: MutableMapping[str, float] = {**self._scores}
+        for sort_by, score, mtime in rows:
+            scaled = score * self._scale(mtime)
+            scores[sort_by] = scores.get(sort_by, 0) + scaled
+        self._scores = scores
+        await self._compact()
+
+    async def _compact(self) -> None:
+        floor = _MIN_SCORE * self._scale(time())
+        ranked = sorted(self._scores.items(), key=lambda kv: kv[1], reverse=True)
+        dead = {
+            sort_by
+            for idx, (sort_by, score) in enumerate(ranked)
+            if idx >= _SIZE or score < floor
+        }
+        if dead:
+            self._scores = {
+                sort_by: score
+                for sort_by, score in self._scores.items()
+                if sort_by not in dead
+            }
+
+        def cont() -> None:
+            with suppress(OperationalError):
+                with self._conn, closing(self._conn.cursor()) as cursor:
+                    cursor.executemany(
+                        sql("delete", "frecency"),
+                        ({"sort_by": sort_by} for sort_by in dead),
+                    )
+                    cursor.execute("PRAGMA optimize", ())
+
+        async with self._lock:
+            await self._ex.background(cont)
+
+    def scores(self) -> Mapping[str, float]:
+        """
+        Only the relative sizes are meaningful
+        """
+
+        return MappingProxyType(self._scores)
+
+    async def bump(self, sort_by: str) -> None:
+        await self._loaded
+
+        now = time()
+        scale = self._scale(now)
+        score = self._scores.get(sort_by, 0) + scale
+        self._scores = {**self._scores, sort_by: score}
+        row = {"sort_by": sort_by, "score": score / scale, "mtime": now}
+
+        def cont() -> None:
+            with suppress(OperationalError):
+                with self._conn, closing(self._conn.cursor()) as cursor:
+                    cursor.execute(sql("insert", "frecency"), row)
+
+        async with self._lock:
+            await self._ex.background(cont)
+
+        if len(self._scores) > _SIZE + _SLACK:
+            await self._compact()
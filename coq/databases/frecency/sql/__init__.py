@@ -0,0 +1,8 @@
+"""
+This file defines sql as a submodule of frecency/databases/coq.
+"""
+from pathlib import Path
+
+from ....shared.sql import loader
+
+sql = loader(Path(__file__).resolve(strict=True).parent)
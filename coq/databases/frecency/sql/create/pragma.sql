@@ -0,0 +1 @@
+PRAGMA journal_mode=WAL;
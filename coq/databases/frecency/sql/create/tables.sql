@@ -0,0 +1,11 @@
+BEGIN;
+
+
+CREATE TABLE IF NOT EXISTS frecency (
+  sort_by TEXT NOT NULL PRIMARY KEY,
+  score   REAL NOT NULL,
+  mtime   REAL NOT NULL
+) WITHOUT ROWID;
+
+
+END;
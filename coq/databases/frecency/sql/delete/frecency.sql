@@ -0,0 +1,3 @@
+DELETE FROM frecency
+WHERE
+  sort_by = :sort_by
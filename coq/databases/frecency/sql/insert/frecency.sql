@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO frecency ( sort_by,  score,  mtime)
+VALUES                          (:sort_by, :score, :mtime)
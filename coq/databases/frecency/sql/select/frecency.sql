@@ -0,0 +1,5 @@
+SELECT
+  sort_by,
+  score,
+  mtime
+FROM frecency
@@ -1,11 +1,20 @@
 from contextlib import closing
 from dataclasses import dataclass
-from sqlite3 import Connection, OperationalError
-from typing import Iterator, Mapping
+from sqlite3 import Connection, Cursor
+from typing import (
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Sequence,
+    Tuple,
+)
 
 from ...consts import INSERT_DB
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
+from ...shared.runtime import Latency
 from ...shared.sql import init_db
+from ..frecency.database import FDB
 from ..types import Interruptible
 from .sql import sql
 
@@ -14,6 +23,7 @@ from .sql import sql
 class Statistics:
     source: str
     interrupted: int
+    truncated: int
     inserted: int
 
     avg_duration: float
@@ -27,6 +37,11 @@ class Statistics:
     q99_items: int
 
 
+_BUFFER_SIZE = 99
+_LATENCY_WINDOW = 99
+_LATENCY_SAMPLES = 9
+
+
 def _init() -> Connection:
     conn = Connection(INSERT_DB, isolation_level=None)
     init_db(conn)
@@ -35,10 +50,58 @@ def _init() -> Connection:
     return conn
 
 
+def _quantile(durations: Sequence[float], q: float) -> float:
+    idx = min(len(durations) - 1, int(q * len(durations)))
+    return durations[idx]
+
+
+def _flush(
+    cursor: Cursor,
+    batches: Sequence[Mapping],
+    instances: Sequence[Mapping],
+    stats: Sequence[Mapping],
+) -> None:
+    # FK order
+    cursor.executemany(sql("insert", "batch"), batches)
+    cursor.executemany(sql("insert", "instance"), instances)
+    cursor.executemany(sql("insert", "instance_stat"), stats)
+
+
 class IDB(Interruptible):
-    def __init__(self) -> None:
-        self._ex = SingleThreadExecutor()
+    """
+    Batches, instances and stats are write-behind,
+    flushed on idle, when the buffer fills, or before reads
+    """
+
+    def __init__(self, frecency: FDB) -> None:
+        self._ex = DBExecutor()
+        self._frecency = frecency
         self._conn: Connection = self._ex.ssubmit(_init)
+        self._batches: MutableSequence[Mapping] = []
+        self._instances: MutableSequence[Mapping] = []
+        self._stats: MutableSequence[Mapping] = []
+
+    def _pending(
+        self,
+    ) -> Tuple[Sequence[Mapping], Sequence[Mapping], Sequence[Mapping]]:
+        pending = self._batches, self._instances, self._stats
+        self._batches, self._instances, self._stats = [], [], []
+        return pending
+
+    def _full(self) -> bool:
+        size = len(self._batches) + len(self._instances) + len(self._stats)
+        return size >= _BUFFER_SIZE
+
+    async def flush(self) -> None:
+        batches, instances, stats = self._pending()
+
+        def cont() -> None:
+            with self._conn, closing(self._conn.cursor()) as cursor:
+                _flush(cursor, batches=batches, instances=instances, stats=stats)
+
+        if batches or instances or stats:
+            async with self._lock:
+                await self._ex.background(cont)
 
     async def new_source(self, source: str) -> None:
         def c1() -> None:
@@ -46,74 +109,69 @@ class IDB(Interruptible):
                 cursor.execute(sql("insert", "source"), {"name": source})
 
         async with self._lock:
-            self._ex.submit(c1)
+            await self._ex.background(c1)
 
     async def new_batch(self, batch_id: bytes) -> None:
-        def cont() -> None:
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.execute(sql("insert", "batch"), {"rowid": batch_id})
-
-        async with self._lock:
-            await self._ex.submit(cont)
+        self._batches.append({"rowid": batch_id})
+        if self._full():
+            await self.flush()
 
     async def new_instance(self, instance: bytes, source: str, batch_id: bytes) -> None:
-        def cont(_: None = None) -> None:
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.execute(
-                    sql("insert", "instance"),
-                    {"rowid": instance, "source_id": source, "batch_id": batch_id},
-                )
-
-        async with self._lock:
-            await self._ex.submit(cont)
+        self._instances.append(
+            {"rowid": instance, "source_id": source, "batch_id": batch_id}
+        )
+        if self._full():
+            await self.flush()
 
     async def new_stat(
-        self, instance: bytes, interrupted: bool, duration: float, items: int
+        self,
+        instance: bytes,
+        interrupted: bool,
+        truncated: bool,
+        duration: float,
+        items: int,
     ) -> None:
-        def cont() -> None:
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.execute(
-                    sql("insert", "instance_stat"),
-                    {
-                        "instance_id": instance,
-                        "interrupted": interrupted,
-                        "duration": duration,
-                        "items": items,
-                    },
-                )
-
-        async with self._lock:
-            await self._ex.submit(cont)
-
-    async def insertion_order(self, n_rows: int) -> Mapping[str, int]:
-        def cont() -> Mapping[str, int]:
-            try:
-                with self._conn, closing(self._conn.cursor()) as cursor:
-                    cursor.execute(sql("select", "inserted"), {"limit": n_rows})
-                    order = {
-                        row["sort_by"]: row["insert_order"] for row in cursor.fetchall()
-                    }
-                    return order
-            except OperationalError:
-                return {}
-
-        async with self._interruption():
-            return await self._ex.submit(cont)
+        self._stats.append(
+            {
+                "instance_id": instance,
+                "interrupted": interrupted,
+                "truncated": truncated,
+                "duration": duration,
+                "items": items,
+            }
+        )
+        if self._full():
+            await self.flush()
+
+    def insertion_order(self) -> Mapping[str, float]:
+        """
+        Frecency of inserted `sort_by`s, larger is more recent / frequent
+        """
+
+        return self._frecency.scores()
 
     async def inserted(self, instance_id: bytes, sort_by: str) -> None:
+        await self._frecency.bump(sort_by)
+
+        batches, instances, stats = self._pending()
+
         def cont() -> None:
             with self._conn, closing(self._conn.cursor()) as cursor:
+                _flush(cursor, batches=batches, instances=instances, stats=stats)
                 cursor.execute(
                     sql("insert", "inserted"),
                     {"instance_id": instance_id, "sort_by": sort_by},
                 )
 
         async with self._lock:
-            self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def stats(self) -> Iterator[Statistics]:
+        batches, instances, stats = self._pending()
+
         def cont() -> Iterator[Statistics]:
             with self._conn, closing(self._conn.cursor()) as cursor:
+                _flush(cursor, batches=batches, instances=instances, stats=stats)
                 cursor.execute(sql("select", "summaries"), ())
                 rows = cursor.fetchall()
 
@@ -122,6 +180,7 @@ class IDB(Interruptible):
                     stat = Statistics(
                         source=row["source"],
                         interrupted=row["interrupted"],
+                        truncated=row["truncated"],
                         inserted=row["inserted"],
                         avg_duration=row["avg_duration"],
                         avg_items=row["avg_items"],
@@ -138,3 +197,35 @@ class IDB(Interruptible):
 
         async with self._lock:
             return await self._ex.submit(cont)
+
+    async def latencies(self) -> Mapping[str, Latency]:
+        """
+        Duration quantiles over the most recent instances of each source
+
+        Interrupted instances count at their duration so far, a lower bound
+        """
+
+        batches, instances, stats = self._pending()
+
+        def cont() -> Mapping[str, Latency]:
+            with self._conn, closing(self._conn.cursor()) as cursor:
+                _flush(cursor, batches=batches, instances=instances, stats=stats)
+                cursor.execute(sql("select", "latencies"), {"window": _LATENCY_WINDOW})
+                rows = cursor.fetchall()
+
+            acc: MutableMapping[str, MutableSequence[float]] = {}
+            for row in rows:
+                acc.setdefault(row["source"], []).append(row["duration"])
+
+            latencies = {
+                source: Latency(
+                    q50_duration=_quantile(durations, q=0.5),
+                    q95_duration=_quantile(durations, q=0.95),
+                )
+                for source, durations in ((k, sorted(v)) for k, v in acc.items())
+                if len(durations) >= _LATENCY_SAMPLES
+            }
+            return latencies
+
+        async with self._lock:
+            return await self._ex.background(cont)
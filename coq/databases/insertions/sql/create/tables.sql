@@ -25,7 +25,8 @@ CREATE TABLE IF NOT EXISTS instance_stats (
   instance_id BLOB    NOT NULL REFERENCES instances (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
   interrupted INTEGER NOT NULL,
   duration    REAL    NOT NULL,
-  items       INTEGER NOT NULL
+  items       INTEGER NOT NULL,
+  truncated   INTEGER NOT NULL
 );
 CREATE INDEX IF NOT EXISTS instance_stats_instance_id ON instance_stats (instance_id);
 
@@ -49,7 +50,8 @@ SELECT
   instances.source_id                     AS source,
   COALESCE(instance_stats.interrupted, 1) AS interrupted,
   instance_stats.duration                 AS duration,
-  COALESCE(instance_stats.items, 0)       AS items
+  COALESCE(instance_stats.items, 0)       AS items,
+  COALESCE(instance_stats.truncated, 0)   AS truncated
 FROM instances
 LEFT JOIN instance_stats
 ON
@@ -92,6 +94,7 @@ CREATE VIEW IF NOT EXISTS stats_summaries_view AS
 SELECT
   source                         AS source,
   COALESCE(SUM(interrupted), 0)  AS interrupted,
+  COALESCE(SUM(truncated), 0)    AS truncated,
   COALESCE(AVG(duration), 0)     AS avg_duration,
   COALESCE(AVG(items), 0)        AS avg_items
 FROM instance_stats_view
@@ -115,6 +118,7 @@ CREATE VIEW IF NOT EXISTS stats_view AS
 SELECT
   sources.name                                   AS source,
   COALESCE(stats_summaries_view.interrupted, 0)  AS interrupted,
+  COALESCE(stats_summaries_view.truncated, 0)    AS truncated,
   COALESCE(stats_summaries_view.avg_items, 0)    AS avg_items,
   COALESCE(stats_summaries_view.avg_duration, 0) AS avg_duration,
   COALESCE(stats_inserted_view.inserted, 0)      AS inserted,
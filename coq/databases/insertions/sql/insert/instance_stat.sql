@@ -1,2 +1,2 @@
-INSERT INTO instance_stats ( instance_id,  interrupted,  duration,  items)
-VALUES                     (:instance_id, :interrupted, :duration, :items)
+INSERT INTO instance_stats ( instance_id,  interrupted,  duration,  items,  truncated)
+VALUES                     (:instance_id, :interrupted, :duration, :items, :truncated)
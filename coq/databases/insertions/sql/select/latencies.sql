@@ -0,0 +1,18 @@
+SELECT
+  source,
+  duration
+FROM (
+  SELECT
+    instances.source_id     AS source,
+    instance_stats.duration AS duration,
+    ROW_NUMBER() OVER (
+      PARTITION BY instances.source_id
+      ORDER BY instance_stats.rowid DESC
+    )                       AS nth
+  FROM instance_stats
+  JOIN instances
+  ON
+    instances.rowid = instance_stats.instance_id
+)
+WHERE
+  nth <= :window
@@ -0,0 +1,3 @@
+"""
+This file defines ngrams as a submodule of databases/coq.
+"""
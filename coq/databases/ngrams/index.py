@@ -0,0 +1,87 @@
+from math import ceil
+from sqlite3 import Connection, Cursor
+from string import ascii_lowercase, ascii_uppercase
+from typing import AbstractSet, Iterable, Iterator, Mapping, MutableSet, Optional
+
+from ...shared.settings import MatchOptions
+from .sql import sql
+
+_N = 2
+# Shorter queries are left to the prefix `LIKE`
+_MIN_GRAMS = 2
+# Same as SQLite's `LOWER()`, which only folds ASCII
+_LOWER = str.maketrans(ascii_uppercase, ascii_lowercase)
+
+
+def sql_lower(word: str) -> str:
+    return word.translate(_LOWER)
+
+
+def ngrams(word: str) -> AbstractSet[str]:
+    lword = sql_lower(word)
+    return {lword[i : i + _N] for i in range(len(lword) - _N + 1)}
+
+
+def min_grams(opts: MatchOptions, query: str) -> Optional[int]:
+    """
+    n-grams a fuzzy candidate must share with `query`, `None` if it is too short
+    """
+
+    if (count := len(ngrams(query))) >= _MIN_GRAMS:
+        return max(1, ceil(opts.fuzzy_cutoff * count))
+    else:
+        return None
+
+
+def init_ngrams(conn: Connection) -> None:
+    conn.executescript(sql("create", "tables"))
+
+
+class NGramIndex:
+    """
+    Posting lists of `lword`s by n-gram, shared by the word bank databases
+
+    `ngram_hits` holds the fuzzy candidates for the current select
+    """
+
+    def __init__(self) -> None:
+        self._indexed: MutableSet[str] = set()
+
+    def index(self, cursor: Cursor, words: Iterable[str]) -> None:
+        """
+        `lword`s are only taken as indexed once their postings are written,
+        a failed or interrupted insert is redone on the next `index`
+        """
+
+        lwords = {sql_lower(word) for word in words} - self._indexed
+
+        def cont() -> Iterator[Mapping]:
+            for lword in lwords:
+                for gram in ngrams(lword):
+                    yield {"gram": gram, "lword": lword}
+
+        cursor.executemany(sql("insert", "ngram"), cont())
+        self._indexed |= lwords
+
+    def prune(self, cursor: Cursor) -> None:
+        """
+        Drop the postings of `lword`s no longer in the `ngram_lwords` view,
+        which every word bank database defines
+        """
+
+        cursor.execute(sql("delete", "dead"), ())
+        cursor.execute(sql("select", "lwords"), ())
+        self._indexed = {row["lword"] for row in cursor.fetchall()}
+
+    def clear(self, cursor: Cursor) -> None:
+        cursor.execute(sql("delete", "ngrams"), ())
+        self._indexed.clear()
+
+    def hits(self, cursor: Cursor, opts: MatchOptions, word: str, sym: str) -> None:
+        cursor.execute(sql("delete", "hits"), ())
+        for query in (word, sym):
+            if (n_grams := min_grams(opts, query=query)) is not None:
+                cursor.execute(
+                    sql("insert", "hits"),
+                    {"word": query, "n": _N, "min_grams": n_grams},
+                )
@@ -0,0 +1,17 @@
+BEGIN;
+
+
+CREATE TABLE IF NOT EXISTS ngrams (
+  gram  TEXT NOT NULL,
+  lword TEXT NOT NULL,
+  UNIQUE(gram, lword)
+);
+CREATE INDEX IF NOT EXISTS ngrams_lword ON ngrams (lword);
+
+
+CREATE TEMP TABLE IF NOT EXISTS ngram_hits (
+  lword TEXT NOT NULL PRIMARY KEY
+) WITHOUT ROWID;
+
+
+END;
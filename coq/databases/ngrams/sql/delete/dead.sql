@@ -0,0 +1,3 @@
+DELETE FROM ngrams
+WHERE
+  lword NOT IN (SELECT lword FROM ngram_lwords)
@@ -0,0 +1 @@
+DELETE FROM ngram_hits
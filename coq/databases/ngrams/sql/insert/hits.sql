@@ -0,0 +1,26 @@
+INSERT OR IGNORE INTO ngram_hits (lword)
+WITH RECURSIVE offsets (i) AS (
+  SELECT
+    1
+  UNION ALL
+  SELECT
+    i + 1
+  FROM offsets
+  WHERE
+    i < LENGTH(:word) - :n + 1
+),
+grams (gram) AS (
+  SELECT DISTINCT
+    SUBSTR(LOWER(:word), i, :n)
+  FROM offsets
+)
+SELECT
+  ngrams.lword
+FROM ngrams
+JOIN grams
+ON
+  grams.gram = ngrams.gram
+GROUP BY
+  ngrams.lword
+HAVING
+  COUNT(*) >= :min_grams
@@ -0,0 +1,2 @@
+INSERT OR IGNORE INTO ngrams ( gram,  lword)
+VALUES                       (:gram, :lword)
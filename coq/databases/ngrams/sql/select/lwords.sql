@@ -0,0 +1,3 @@
+SELECT DISTINCT
+  lword
+FROM ngrams
@@ -5,10 +5,11 @@ from sqlite3 import Connection, Cursor, OperationalError
 from typing import AbstractSet, Any, Iterator, Mapping, Sequence
 
 from ...consts import REGISTER_DB
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.parse import coalesce, tokenize
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
+from ..ngrams.index import NGramIndex, init_ngrams
 from ..types import Interruptible
 from .sql import sql
 
@@ -26,6 +27,7 @@ def _init() -> Connection:
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
     conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
     return conn
 
 
@@ -36,10 +38,11 @@ class RDB(Interruptible):
         unifying_chars: AbstractSet[str],
         include_syms: bool,
     ) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
         self._tokenization_limit = tokenization_limit
         self._unifying_chars = unifying_chars
         self._include_syms = include_syms
+        self._ngrams = NGramIndex()
         self._conn: Connection = self._ex.ssubmit(_init)
 
     async def periodical(
@@ -77,11 +80,14 @@ class RDB(Interruptible):
                 with self._conn, closing(self._conn.cursor()) as cursor:
                     cursor.executemany(sql("delete", "register"), m1)
                     cursor.executemany(sql("insert", "register"), m1)
-                    cursor.executemany(sql("insert", "word"), m2())
+                    words = [*m2()]
+                    cursor.executemany(sql("insert", "word"), words)
+                    self._ngrams.prune(cursor)
+                    self._ngrams.index(cursor, words=(row["word"] for row in words))
                     cursor.executemany(sql("insert", "line"), m3())
                     cursor.execute("PRAGMA optimize", ())
 
-        await self._ex.submit(cont)
+        await self._ex.background(cont)
 
     async def select(
         self,
@@ -110,6 +116,12 @@ class RDB(Interruptible):
         def cont() -> Iterator[RegWord]:
             try:
                 with self._conn, closing(self._conn.cursor()) as cursor:
+                    self._ngrams.hits(
+                        cursor,
+                        opts=opts,
+                        word=word,
+                        sym=(sym if match_syms else ""),
+                    )
                     lines = (
                         fetch(cursor, match_syms=True, stmt="lines") if linewise else ()
                     )
@@ -29,4 +29,11 @@ CREATE INDEX IF NOT EXISTS lines_word     ON lines (word);
 CREATE INDEX IF NOT EXISTS lines_lword    ON lines (lword);
 
 
+-- `lword`s the n-gram index keeps postings for
+CREATE VIEW IF NOT EXISTS ngram_lwords AS
+SELECT
+  lword
+FROM words;
+
+
 END;
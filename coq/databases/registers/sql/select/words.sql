@@ -7,7 +7,11 @@ WHERE
   (
     :word <> ''
     AND
-    lword LIKE :like_word ESCAPE '!'
+    (
+      lword LIKE :like_word ESCAPE '!'
+      OR
+      lword IN (SELECT lword FROM ngram_hits)
+    )
     AND
     LENGTH(word) + :look_ahead >= LENGTH(:word)
     AND
@@ -19,7 +23,11 @@ WHERE
   (
     :sym <> ''
     AND
-    lword LIKE :like_sym ESCAPE '!'
+    (
+      lword LIKE :like_sym ESCAPE '!'
+      OR
+      lword IN (SELECT lword FROM ngram_hits)
+    )
     AND
     LENGTH(word) + :look_ahead >= LENGTH(:sym)
     AND
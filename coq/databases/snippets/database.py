@@ -5,7 +5,7 @@ from sqlite3 import Connection, OperationalError
 from typing import AbstractSet, Iterator, Mapping, TypedDict, cast
 from uuid import uuid4
 
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
 from ...snippets.types import LoadedSnips
@@ -36,7 +36,7 @@ def _init(db_dir: Path) -> Connection:
 class SDB(Interruptible):
     def __init__(self, vars_dir: Path) -> None:
         db_dir = vars_dir / "clients" / "snippets"
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
         self._conn: Connection = self._ex.ssubmit(lambda: _init(db_dir))
 
     async def clean(self, paths: AbstractSet[PurePath]) -> None:
@@ -48,7 +48,7 @@ class SDB(Interruptible):
                 )
 
         async with self._lock:
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def mtimes(self) -> Mapping[PurePath, float]:
         def cont() -> Mapping[PurePath, float]:
@@ -59,7 +59,7 @@ class SDB(Interruptible):
                 }
 
         async with self._lock:
-            return await self._ex.submit(cont)
+            return await self._ex.background(cont)
 
     async def populate(self, path: PurePath, mtime: float, loaded: LoadedSnips) -> None:
         def cont() -> None:
@@ -107,7 +107,7 @@ class SDB(Interruptible):
                 cursor.execute("PRAGMA optimize", ())
 
         async with self._lock:
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def select(
         self, opts: MatchOptions, filetype: str, word: str, sym: str, limitless: int
@@ -7,7 +7,7 @@ from typing import AbstractSet, Iterator, Mapping, cast
 
 from pynvim_pp.lib import encode
 
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
 from ...tags.types import Tag, Tags
@@ -44,7 +44,7 @@ def _init(db_dir: Path, cwd: PurePath) -> Connection:
 
 class CTDB(Interruptible):
     def __init__(self, vars_dir: Path, cwd: PurePath) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
         self._vars_dir = vars_dir / "clients" / "tags"
         self._conn: Connection = self._ex.ssubmit(
             lambda: _init(self._vars_dir, cwd=cwd)
@@ -56,7 +56,7 @@ class CTDB(Interruptible):
             self._conn = _init(self._vars_dir, cwd=cwd)
 
         async with self._lock:
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def paths(self) -> Mapping[str, float]:
         def cont() -> Mapping[str, float]:
@@ -66,7 +66,7 @@ class CTDB(Interruptible):
                 return files
 
         try:
-            return await self._ex.submit(cont)
+            return await self._ex.background(cont)
         except OperationalError:
             return {}
 
@@ -96,7 +96,7 @@ class CTDB(Interruptible):
                     cursor.executemany(sql("insert", "tag"), m2())
                     cursor.execute("PRAGMA optimize", ())
 
-        await self._ex.submit(cont)
+        await self._ex.background(cont)
 
     async def select(
         self,
@@ -4,11 +4,12 @@ from sqlite3 import Connection, OperationalError
 from typing import AbstractSet, Iterator, Mapping, MutableMapping, Optional
 
 from ...consts import TMUX_DB
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.parse import tokenize
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
 from ...tmux.parse import Pane
+from ..ngrams.index import NGramIndex, init_ngrams
 from ..types import Interruptible
 from .sql import sql
 
@@ -28,6 +29,7 @@ def _init() -> Connection:
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
     conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
     return conn
 
 
@@ -38,12 +40,13 @@ class TMDB(Interruptible):
         unifying_chars: AbstractSet[str],
         include_syms: bool,
     ) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
         self._current: Optional[Pane] = None
         self._tokenization_limit = tokenization_limit
         self._unifying_chars = unifying_chars
         self._include_syms = include_syms
         self._cache: MutableMapping[str, str] = {}
+        self._ngrams = NGramIndex()
         self._conn: Connection = self._ex.ssubmit(_init)
 
     async def periodical(
@@ -99,10 +102,13 @@ class TMDB(Interruptible):
                     existing = {row["pane_id"] for row in cursor.fetchall()}
                     cursor.executemany(sql("delete", "pane"), m1(existing))
                     cursor.executemany(sql("insert", "pane"), m2())
-                    cursor.executemany(sql("insert", "word"), m3())
+                    words = [*m3()]
+                    cursor.executemany(sql("insert", "word"), words)
+                    self._ngrams.prune(cursor)
+                    self._ngrams.index(cursor, words=(row["word"] for row in words))
                     cursor.execute("PRAGMA optimize", ())
 
-        await self._ex.submit(cont)
+        await self._ex.background(cont)
 
     async def select(
         self, opts: MatchOptions, word: str, sym: str, limitless: int
@@ -110,6 +116,7 @@ class TMDB(Interruptible):
         def cont() -> Iterator[TmuxWord]:
             try:
                 with self._conn, closing(self._conn.cursor()) as cursor:
+                    self._ngrams.hits(cursor, opts=opts, word=word, sym=sym)
                     cursor.execute(
                         sql("select", "words"),
                         {
@@ -3,10 +3,11 @@ from sqlite3 import Connection, Cursor, OperationalError
 from typing import Iterable, Iterator, Mapping
 
 from ...consts import TREESITTER_DB
-from ...shared.executor import SingleThreadExecutor
+from ...shared.executor import DBExecutor
 from ...shared.settings import MatchOptions
 from ...shared.sql import BIGGEST_INT, init_db, like_esc
 from ...treesitter.types import Payload, SimplePayload
+from ..ngrams.index import NGramIndex, init_ngrams
 from ..types import Interruptible
 from .sql import sql
 
@@ -16,6 +17,7 @@ def _init() -> Connection:
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
     conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
     return conn
 
 
@@ -34,7 +36,8 @@ def _ensure_buffer(cursor: Cursor, buf_id: int, filetype: str, filename: str) ->
 
 class TDB(Interruptible):
     def __init__(self) -> None:
-        self._ex = SingleThreadExecutor()
+        self._ex = DBExecutor()
+        self._ngrams = NGramIndex()
         self._conn: Connection = self._ex.ssubmit(_init)
 
     async def vacuum(self, live_bufs: Mapping[int, int]) -> None:
@@ -55,9 +58,10 @@ class TDB(Interruptible):
                             for buf_id, line_count in live_bufs.items()
                         ),
                     )
+                    self._ngrams.prune(cursor)
                     cursor.execute("PRAGMA optimize", ())
 
-        await self._ex.submit(cont)
+        await self._ex.background(cont)
 
     async def populate(
         self,
@@ -92,10 +96,12 @@ class TDB(Interruptible):
                     sql("delete", "words"),
                     {"buffer_id": buf_id, "lo": lo, "hi": hi},
                 )
-                cursor.executemany(sql("insert", "word"), m1())
+                words = [*m1()]
+                cursor.executemany(sql("insert", "word"), words)
+                self._ngrams.index(cursor, words=(row["word"] for row in words))
 
         with suppress(OperationalError):
-            await self._ex.submit(cont)
+            await self._ex.background(cont)
 
     async def select(
         self,
@@ -108,6 +114,7 @@ class TDB(Interruptible):
         def cont() -> Iterator[Payload]:
             try:
                 with self._conn, closing(self._conn.cursor()) as cursor:
+                    self._ngrams.hits(cursor, opts=opts, word=word, sym=sym)
                     cursor.execute(
                         sql("select", "words"),
                         {
@@ -52,4 +52,11 @@ HAVING
   words.word <> '';
 
 
+-- `lword`s the n-gram index keeps postings for
+CREATE VIEW IF NOT EXISTS ngram_lwords AS
+SELECT
+  lword
+FROM words;
+
+
 END;
@@ -34,9 +34,18 @@ _ENCODER = new_encoder[VimCompletion](VimCompletion)
 
 
 async def complete(
-    stack: Stack, col: int, comps: Iterable[Tuple[Metric, VimCompletion]]
+    stack: Stack,
+    col: int,
+    comps: Iterable[Tuple[Metric, VimCompletion]],
+    merge: bool = False,
 ) -> None:
-    stack.metrics.clear()
+    """
+    `merge` replaces an earlier popup of the same keystroke,
+    unless the user has already selected an item in it
+    """
+
+    if not merge:
+        stack.metrics.clear()
 
     acc: MutableSequence[Any] = []
     for metric, comp in comps:
@@ -44,4 +53,6 @@ async def complete(
         encoded = _ENCODER(comp)
         acc.append(encoded)
 
-    await Nvim.api.exec_lua(NoneType, f"{NAMESPACE}.send_comp(...)", (col + 1, acc))
+    await Nvim.api.exec_lua(
+        NoneType, f"{NAMESPACE}.send_comp(...)", (col + 1, acc, merge)
+    )
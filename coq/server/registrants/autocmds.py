@@ -101,6 +101,11 @@ async def _on_focus(stack: Stack) -> None:
 _ = autocmd("FocusGained") << f"lua {NAMESPACE}.{_on_focus.method}()"
 
 
+async def _learn(stack: Stack) -> None:
+    latencies = await stack.idb.latencies()
+    stack.supervisor.learn(latencies)
+
+
 @rpc()
 async def _when_idle(stack: Stack) -> None:
     if task := _CELL.val:
@@ -116,7 +121,11 @@ async def _when_idle(stack: Stack) -> None:
                 await Nvim.api.buf_detach(NoneType, buf)
                 state(nono_bufs={buf.number})
 
-        await gather(_insert_enter(stack=stack), stack.supervisor.notify_idle())
+        await gather(
+            _insert_enter(stack=stack),
+            stack.supervisor.notify_idle(),
+            _learn(stack),
+        )
 
     _CELL.val = create_task(cont())
 
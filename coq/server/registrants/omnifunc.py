@@ -9,15 +9,14 @@ from pynvim_pp.lib import encode
 from pynvim_pp.logging import log, suppress_and_log
 from pynvim_pp.nvim import Nvim
 from std2.asyncio import cancel
-from std2.locale import si_prefixed_smol
 from std2.pickle.decoder import new_decoder
 from std2.pickle.types import DecodeError
 
-from ...consts import DEBUG
 from ...lsp.requests.command import cmd
 from ...lsp.requests.resolve import resolve
 from ...registry import NAMESPACE, autocmd, rpc
-from ...shared.runtime import Metric
+from ...shared.runtime import Metric, MetricBatch
+from ...shared.timeit import record
 from ...shared.types import ChangeEvent, Context, ExternLSP, ExternPath
 from ..completions import complete
 from ..context import context
@@ -74,33 +73,66 @@ async def comp_func(
 
         if should:
             state(context=ctx)
-            metrics, _ = await gather(
-                stack.supervisor.collect(ctx),
+            shown = False
+
+            async def show(batch: MetricBatch, final: bool = False) -> None:
+                nonlocal shown
+                s = state()
+                if s.change_id == ctx.change_id:
+                    vim_comps = tuple(
+                        trans(
+                            stack,
+                            pum_width=s.pum_width,
+                            context=ctx,
+                            batch=batch,
+                        )
+                    )
+                    await complete(stack=stack, col=col, comps=vim_comps, merge=shown)
+                    if not shown:
+                        record("POPUP -- FIRST", monotonic() - t0)
+                    if final:
+                        record("POPUP -- FINAL", monotonic() - t0)
+                    shown = True
+
+            collecting = stack.supervisor.collect(ctx, progress=show)
+            if refined := stack.supervisor.refine(ctx):
+                await show(refined)
+
+            batch, _ = await gather(
+                collecting,
                 complete(stack=stack, col=col, comps=())
-                if stack.settings.display.pum.fast_close
+                if stack.settings.display.pum.fast_close and not refined
                 else sleep(0),
             )
-            s = state()
-            if s.change_id == ctx.change_id:
-                vim_comps = tuple(
-                    trans(
-                        stack,
-                        pum_width=s.pum_width,
-                        context=ctx,
-                        metrics=metrics,
-                    )
-                )
-                await complete(stack=stack, col=col, comps=vim_comps)
-                if DEBUG:
-                    t1 = monotonic()
-                    delta = t1 - t0
-                    msg = f"TOTAL >>> {si_prefixed_smol(delta, precision=0)}s".ljust(8)
-                    log.info("%s", msg)
+            await show(batch, final=True)
         else:
             await complete(stack=stack, col=col, comps=())
             state(inserted_pos=(-1, -1))
 
 
+async def _prefetch(stack: Stack) -> None:
+    """
+    Warm `Supervisor.refine` for the next keystroke
+    """
+
+    with suppress_and_log():
+        if stack.settings.completion.always:
+            s = state()
+            ctx = await context(
+                options=stack.settings.match, state=s, change=None, manual=False
+            )
+            if ctx.buf_id not in s.nono_bufs:
+                await stack.supervisor.prefetch(ctx)
+
+
+@rpc()
+async def _on_idle_insert(stack: Stack) -> None:
+    create_task(_prefetch(stack))
+
+
+_ = autocmd("CursorHoldI") << f"lua {NAMESPACE}.{_on_idle_insert.method}()"
+
+
 @rpc()
 async def omnifunc(
     stack: Stack, findstart: Literal[0, 1], base: str
@@ -193,6 +225,7 @@ async def _comp_done(stack: Stack, event: Mapping[str, Any]) -> None:
                             last_edit=new_metric,
                             commit_id=uuid4(),
                         )
+                        create_task(_prefetch(stack))
                     else:
                         log.warn("%s", "delayed completion")
 
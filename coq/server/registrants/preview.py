@@ -20,7 +20,6 @@ from uuid import UUID, uuid4
 
 from pynvim_pp.buffer import Buffer, ExtMark, ExtMarker
 from pynvim_pp.float_win import border_w_h, list_floatwins
-from pynvim_pp.lib import display_width
 from pynvim_pp.logging import suppress_and_log
 from pynvim_pp.nvim import Nvim
 from pynvim_pp.preview import buf_set_preview, set_preview
@@ -39,6 +38,7 @@ from ...shared.settings import GhostText, PreviewDisplay
 from ...shared.timeit import timeit
 from ...shared.trans import expand_tabs
 from ...shared.types import Completion, Context, Doc, Edit, ExternLSP, ExternPath
+from ...shared.width import display_width
 from ..rt_types import Stack
 from ..state import State, state
 
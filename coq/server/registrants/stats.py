@@ -80,6 +80,7 @@ def _trans(stat: Statistics) -> Iterator[Tuple[str, Mapping[str, str]]]:
     stat.interrupted
     m1 = {
         "Interrupted": str(stat.interrupted),
+        "Truncated": str(stat.truncated),
         "Inserted": str(stat.inserted),
     }
     yield stat.source, m1
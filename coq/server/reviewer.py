@@ -1,18 +1,29 @@
 from collections import Counter
 from dataclasses import dataclass
-from itertools import chain
-from typing import Mapping
+from itertools import repeat
+from types import MappingProxyType
+from typing import (
+    AbstractSet,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Sequence,
+    Tuple,
+)
 from uuid import UUID, uuid4
 
-from pynvim_pp.lib import display_width
-
 from ..databases.insertions.database import IDB
+from ..databases.ngrams.index import min_grams, ngrams, sql_lower
 from ..shared.context import cword_before
-from ..shared.fuzzy import MatchMetrics, metrics
+from ..shared.fuzzy import MatchMetrics, metrics_batch, profiled_ratio, query_profile
+from ..shared.lru import LRU
 from ..shared.parse import coalesce, lower
-from ..shared.runtime import Metric, PReviewer
-from ..shared.settings import BaseClient, Icons, MatchOptions, Weights
+from ..shared.repeat import sanitize_cached
+from ..shared.runtime import MetricBatch, PReviewer
+from ..shared.settings import BaseClient, Icons, MatchOptions
 from ..shared.types import Completion, Context
+from ..shared.width import display_width
 from .icons import iconify
 
 
@@ -21,21 +32,102 @@ class ReviewCtx:
     batch: UUID
     context: Context
     proximity: Mapping[str, int]
-    inserted: Mapping[str, int]
+    inserted: Mapping[str, float]
 
     is_lower: bool
 
 
-def _metric(
+class _Proximity:
+    """
+    Word counts of a buffer's window, only re-tokenizes lines that changed
+    """
+
+    def __init__(self) -> None:
+        self._lines: Counter[str] = Counter()
+        self.words: Counter[str] = Counter()
+
+    def update(self, unifying_chars: AbstractSet[str], lines: Sequence[str]) -> None:
+        new_lines = Counter(lines)
+
+        for line, n in (self._lines - new_lines).items():
+            for word in coalesce(
+                unifying_chars, include_syms=True, backwards=None, chars=line
+            ):
+                if (count := self.words[word] - n) > 0:
+                    self.words[word] = count
+                else:
+                    self.words.pop(word, None)
+
+        for line, n in (new_lines - self._lines).items():
+            for word in coalesce(
+                unifying_chars, include_syms=True, backwards=None, chars=line
+            ):
+                self.words[word] += n
+
+        self._lines = new_lines
+
+
+def _cwords(
     options: MatchOptions,
-    ctx: ReviewCtx,
-    completion: Completion,
-) -> MatchMetrics:
-    match = lower(completion.sort_by) if ctx.is_lower else completion.sort_by
-    sort_by, cword = cword_before(
-        options.unifying_chars, lower=ctx.is_lower, context=ctx.context, sort_by=match
+    context: Context,
+    completions: Iterable[Completion],
+) -> Sequence[Tuple[str, str]]:
+    """
+    (sort_by, cword) for each completion
+    """
+
+    acc: MutableSequence[Tuple[str, str]] = []
+    for completion in completions:
+        match = lower(completion.sort_by) if context.is_lower else completion.sort_by
+        sort_by, cword = cword_before(
+            options.unifying_chars,
+            lower=context.is_lower,
+            context=context,
+            sort_by=match,
+        )
+        acc.append((sort_by, cword))
+    return acc
+
+
+def _metrics(
+    options: MatchOptions, cwords: Sequence[Tuple[str, str]]
+) -> Sequence[MatchMetrics]:
+    columns: MutableMapping[str, MutableSequence[Tuple[int, str]]] = {}
+    for idx, (sort_by, cword) in enumerate(cwords):
+        columns.setdefault(cword, []).append((idx, sort_by))
+
+    nil = MatchMetrics(prefix_matches=0, edit_distance=0)
+    acc = [*repeat(nil, len(cwords))]
+    for cword, column in columns.items():
+        scored = metrics_batch(
+            cword,
+            (sort_by for _, sort_by in column),
+            look_ahead=options.look_ahead,
+            fuzzy_cutoff=options.fuzzy_cutoff,
+        )
+        for (idx, _), match_metrics in zip(column, scored):
+            acc[idx] = match_metrics
+    return acc
+
+
+def _refinable(options: MatchOptions, sort_by: str, cword: str) -> bool:
+    """
+    Same filter as the word bank selects, eg. `buffers/sql/select/words.sql`
+    """
+
+    lword = sql_lower(sort_by)
+    prefixed = lword.startswith(sql_lower(cword[: options.exact_matches]))
+    n_grams = min_grams(options, query=cword)
+    hit = n_grams is not None and len(ngrams(cword) & ngrams(lword)) >= n_grams
+    return (
+        (prefixed or hit)
+        and len(sort_by) + options.look_ahead >= len(cword)
+        and sort_by != cword[: len(sort_by)]
+        and profiled_ratio(
+            query_profile(cword), rhs=sort_by, look_ahead=options.look_ahead
+        )
+        >= options.fuzzy_cutoff
     )
-    return metrics(cword, sort_by, look_ahead=options.look_ahead)
 
 
 def sigmoid(x: float) -> float:
@@ -46,58 +138,50 @@ def sigmoid(x: float) -> float:
     return x / (1 + abs(x)) / 2 + 1
 
 
-def _join(
+def _batch(
     ctx: ReviewCtx,
-    instance: UUID,
-    completion: Completion,
-    match_metrics: MatchMetrics,
-) -> Metric:
-    weight = Weights(
-        prefix_matches=match_metrics.prefix_matches,
-        edit_distance=match_metrics.edit_distance,
-        recency=ctx.inserted.get(completion.sort_by, 0),
-        proximity=ctx.proximity.get(completion.sort_by, 0),
-    )
-    label_width = display_width(completion.label, tabsize=ctx.context.tabstop)
-    # !! WARN
-    # Use UTF8 len for icon support
-    # !! WARN
-    kind_width = len(completion.kind)
-    metric = Metric(
-        instance=instance,
-        comp=completion,
-        weight_adjust=sigmoid(completion.weight_adjust),
-        weight=weight,
-        label_width=label_width,
-        kind_width=kind_width,
+    instances: Sequence[UUID],
+    completions: Sequence[Completion],
+    scored: Sequence[MatchMetrics],
+) -> MetricBatch:
+    tabsize = ctx.context.tabstop
+    batch = MetricBatch(
+        instances=instances,
+        comps=completions,
+        prefix_matches=tuple(m.prefix_matches for m in scored),
+        edit_distance=tuple(m.edit_distance for m in scored),
+        recency=tuple(ctx.inserted.get(c.sort_by, 0) for c in completions),
+        proximity=tuple(ctx.proximity.get(c.sort_by, 0) for c in completions),
+        weight_adjust=tuple(sigmoid(c.weight_adjust) for c in completions),
+        label_width=tuple(display_width(c.label, tabsize=tabsize) for c in completions),
+        # !! WARN
+        # Use UTF8 len for icon support
+        # !! WARN
+        kind_width=tuple(len(c.kind) for c in completions),
     )
-    return metric
+    return batch
 
 
 class Reviewer(PReviewer[ReviewCtx]):
     def __init__(self, options: MatchOptions, icons: Icons, db: IDB) -> None:
         self._options, self._icons, self._db = options, icons, db
+        self._proximity: LRU[int, _Proximity] = LRU(size=9)
 
     async def register(self, assoc: BaseClient) -> None:
         await self._db.new_source(assoc.short_name)
 
     async def begin(self, context: Context) -> ReviewCtx:
-        inserted = await self._db.insertion_order(n_rows=100)
-        words = chain.from_iterable(
-            coalesce(
-                self._options.unifying_chars,
-                include_syms=True,
-                backwards=None,
-                chars=line,
-            )
-            for line in context.lines
-        )
-        proximity = Counter(words)
+        inserted = self._db.insertion_order()
+        if (proximity := self._proximity.get(context.buf_id)) is None:
+            proximity = self._proximity[context.buf_id] = _Proximity()
+        proximity.update(self._options.unifying_chars, lines=context.lines)
 
         ctx = ReviewCtx(
             batch=uuid4(),
             context=context,
-            proximity=proximity,
+            # Live view, the next `begin` waits on the supervisor lock for this
+            # token's last `trans`, so the counts cannot move underneath it
+            proximity=MappingProxyType(proximity.words),
             inserted=inserted,
             is_lower=context.is_lower,
         )
@@ -111,24 +195,68 @@ class Reviewer(PReviewer[ReviewCtx]):
             instance.bytes, source=assoc.short_name, batch_id=token.batch.bytes
         )
 
-    def trans(self, token: ReviewCtx, instance: UUID, completion: Completion) -> Metric:
-        new_completion = iconify(self._icons, completion=completion)
-        match_metrics = _metric(
-            self._options,
-            ctx=token,
-            completion=new_completion,
+    def trans(
+        self,
+        token: ReviewCtx,
+        batches: Iterable[Tuple[UUID, Iterable[Completion]]],
+    ) -> MetricBatch:
+        instances: MutableSequence[UUID] = []
+        completions: MutableSequence[Completion] = []
+        for instance, comps in batches:
+            for completion in comps:
+                instances.append(instance)
+                completions.append(iconify(self._icons, completion=completion))
+
+        cwords = _cwords(self._options, context=token.context, completions=completions)
+        scored = _metrics(self._options, cwords=cwords)
+        return _batch(
+            token, instances=instances, completions=completions, scored=scored
+        )
+
+    def refine(self, context: Context, batch: MetricBatch) -> MetricBatch:
+        kept: MutableSequence[Tuple[int, Completion]] = []
+        for idx, completion in enumerate(batch.comps):
+            if comp := sanitize_cached(context.cursor, comp=completion, sort_by=None):
+                kept.append((idx, comp))
+
+        cwords = _cwords(
+            self._options, context=context, completions=(comp for _, comp in kept)
         )
-        metric = _join(
-            token,
-            instance=instance,
-            completion=new_completion,
-            match_metrics=match_metrics,
+        rows: MutableSequence[int] = []
+        comps: MutableSequence[Completion] = []
+        columns: MutableSequence[Tuple[str, str]] = []
+        for (idx, comp), (sort_by, cword) in zip(kept, cwords):
+            if _refinable(self._options, sort_by=sort_by, cword=cword):
+                rows.append(idx)
+                comps.append(comp)
+                columns.append((sort_by, cword))
+
+        scored = _metrics(self._options, cwords=columns)
+        refined = MetricBatch(
+            instances=tuple(batch.instances[idx] for idx in rows),
+            comps=comps,
+            prefix_matches=tuple(m.prefix_matches for m in scored),
+            edit_distance=tuple(m.edit_distance for m in scored),
+            recency=tuple(batch.recency[idx] for idx in rows),
+            proximity=tuple(batch.proximity[idx] for idx in rows),
+            weight_adjust=tuple(batch.weight_adjust[idx] for idx in rows),
+            label_width=tuple(batch.label_width[idx] for idx in rows),
+            kind_width=tuple(batch.kind_width[idx] for idx in rows),
         )
-        return metric
+        return refined
 
     async def s_end(
-        self, instance: UUID, interrupted: bool, elapsed: float, items: int
+        self,
+        instance: UUID,
+        interrupted: bool,
+        truncated: bool,
+        elapsed: float,
+        items: int,
     ) -> None:
         await self._db.new_stat(
-            instance.bytes, interrupted=interrupted, duration=elapsed, items=items
+            instance.bytes,
+            interrupted=interrupted,
+            truncated=truncated,
+            duration=elapsed,
+            items=items,
         )
@@ -22,6 +22,9 @@ from ..clients.tmux.worker import Worker as TmuxWorker
 from ..clients.tree_sitter.worker import Worker as TreeWorker
 from ..consts import CONFIG_YML, SETTINGS_VAR, VARS
 from ..databases.buffers.database import BDB
+from ..databases.buffers.memory import MemoryBDB
+from ..databases.buffers.types import PBDB
+from ..databases.frecency.database import FDB
 from ..databases.insertions.database import IDB
 from ..databases.registers.database import RDB
 from ..databases.snippets.database import SDB
@@ -30,7 +33,7 @@ from ..databases.tmux.database import TMDB
 from ..databases.treesitter.database import TDB
 from ..shared.lru import LRU
 from ..shared.runtime import Supervisor, Worker
-from ..shared.settings import LSPClient, Settings
+from ..shared.settings import BuffersBackend, LSPClient, Settings
 from .reviewer import Reviewer
 from .rt_types import Stack, ValidationError
 from .state import state
@@ -68,10 +71,18 @@ def _from_each_according_to_their_ability(
     clients = settings.clients
 
     if clients.buffers.enabled:
-        bdb = BDB(
-            settings.limits.tokenization_limit,
-            unifying_chars=settings.match.unifying_chars,
-            include_syms=settings.clients.buffers.match_syms,
+        bdb: PBDB = (
+            MemoryBDB(
+                settings.limits.tokenization_limit,
+                unifying_chars=settings.match.unifying_chars,
+                include_syms=settings.clients.buffers.match_syms,
+            )
+            if clients.buffers.backend is BuffersBackend.memory
+            else BDB(
+                settings.limits.tokenization_limit,
+                unifying_chars=settings.match.unifying_chars,
+                include_syms=settings.clients.buffers.match_syms,
+            )
         )
         yield BuffersWorker(supervisor, options=clients.buffers, misc=bdb)
 
@@ -125,7 +136,7 @@ async def stack() -> Stack:
         Path(await Nvim.fn.stdpath(str, "cache")) / "coq" if settings.xdg else VARS
     )
     s = state(cwd=await Nvim.getcwd(), pum_width=pum_width)
-    idb = IDB()
+    idb = IDB(FDB(vars_dir))
     reviewer = Reviewer(
         icons=settings.display.icons,
         options=settings.match,
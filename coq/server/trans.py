@@ -1,75 +1,155 @@
-from dataclasses import asdict
-from itertools import chain
-from locale import strxfrm
-from typing import Any, Callable, Iterable, Iterator, MutableSet, Sequence, Tuple
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain, repeat
+from locale import LC_COLLATE, getlocale, strxfrm
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from pynvim_pp.lib import display_width
 from std2 import clamp
 
-from ..shared.runtime import Metric
+from ..shared.lru import LRU
+from ..shared.runtime import Metric, MetricBatch
 from ..shared.settings import PumDisplay, Weights
+from ..shared.timeit import timeit
+from ..shared.trans import lazy_sorted
 from ..shared.types import Context, SnippetEdit
+from ..shared.width import display_width
 from .completions import VimCompletion
 from .rt_types import Stack
 from .state import state
 
+_XFRM_SIZE = 9999
 
-def _cum(adjustment: Weights, metrics: Iterable[Metric]) -> Weights:
-    zero = Weights(
-        prefix_matches=0,
-        edit_distance=0,
-        recency=0,
-        proximity=0,
-    )
-    acc = asdict(zero)
-    for metric in metrics:
-        for key, val in asdict(metric.weight).items():
-            acc[key] += val
-    for key, val in asdict(adjustment).items():
-        if val:
-            acc[key] /= val
+
+@dataclass
+class _XfrmStats:
+    keys: int = 0
+    lookups: int = 0
+    hits: int = 0
+
+    def __str__(self) -> str:
+        return f"strxfrm :: {self.lookups}/{self.keys} keys, {self.hits} memo hits"
+
+
+class _Xfrm:
+    """
+    `strxfrm` memo, keyed on text and case, reset on locale change
+
+    Under the C locale `strxfrm` is the identity, so it is skipped
+    """
+
+    def __init__(self) -> None:
+        self._locale: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._identity = False
+        self._memo: LRU[Tuple[str, bool], str] = LRU(size=_XFRM_SIZE)
+
+    def refresh(self) -> None:
+        if (locale := getlocale(LC_COLLATE)) != self._locale:
+            self._locale = locale
+            self._identity = locale == (None, None)
+            self._memo = LRU(size=_XFRM_SIZE)
+
+    def __call__(self, text: str, is_lower: bool, stats: _XfrmStats) -> str:
+        stats.lookups += 1
+        if self._identity:
+            return text.swapcase() if is_lower else text
+        elif (xfrm := self._memo.get((text, is_lower))) is None:
+            xfrm = strxfrm(text.swapcase() if is_lower else text)
+            self._memo[(text, is_lower)] = xfrm
         else:
-            acc[key] = 0
-    return Weights(**acc)
+            stats.hits += 1
+        return xfrm
+
 
+_XFRM = _Xfrm()
 
-def _sort_by(is_lower: bool, adjustment: Weights) -> Callable[[Metric], Any]:
-    adjust = asdict(adjustment)
 
-    def key_by(metric: Metric) -> Any:
-        tot = sum(
-            val / adjust[key] if adjust[key] else 0
-            for key, val in asdict(metric.weight).items()
+def _cum(adjustment: Weights, batch: MetricBatch) -> Weights:
+    def cont(column: Sequence[float], adjust: float) -> float:
+        return sum(column) / adjust if adjust else 0
+
+    return Weights(
+        prefix_matches=cont(batch.prefix_matches, adjustment.prefix_matches),
+        edit_distance=cont(batch.edit_distance, adjustment.edit_distance),
+        recency=cont(batch.recency, adjustment.recency),
+        proximity=cont(batch.proximity, adjustment.proximity),
+    )
+
+
+def _scores(adjustment: Weights, batch: MetricBatch) -> Sequence[int]:
+    """
+    Normalized, weighted total of every row, in one pass
+    """
+
+    def cont(column: Sequence[float], adjust: float) -> Iterable[float]:
+        return [val / adjust for val in column] if adjust else repeat(0)
+
+    columns = zip(
+        cont(batch.prefix_matches, adjustment.prefix_matches),
+        cont(batch.edit_distance, adjustment.edit_distance),
+        cont(batch.recency, adjustment.recency),
+        cont(batch.proximity, adjustment.proximity),
+        batch.weight_adjust,
+    )
+    return [
+        round((p_matches + edit_dist + recency + proximity) * weight_adjust * 10000)
+        for p_matches, edit_dist, recency, proximity, weight_adjust in columns
+    ]
+
+
+def _sort_by(
+    is_lower: bool, batch: MetricBatch, scores: Sequence[int], stats: _XfrmStats
+) -> Callable[[int], Any]:
+    """
+    Only pays for `strxfrm` on rows whose head ties with another row's
+    """
+
+    heads = [
+        (
+            -(comp.always_on_top),
+            -(comp.preselect),
+            -score,
+            -len(comp.secondary_edits),
+            -(comp.kind != ""),
+            -(comp.doc is not None),
+            -comp.sort_by[:1].isalnum(),
         )
-        key = (
-            -(metric.comp.always_on_top),
-            -(metric.comp.preselect),
-            -round(tot * metric.weight_adjust * 10000),
-            -len(metric.comp.secondary_edits),
-            -(metric.comp.kind != ""),
-            -(metric.comp.doc is not None),
-            -metric.comp.sort_by[:1].isalnum(),
-            strxfrm(
-                metric.comp.sort_by.swapcase() if is_lower else metric.comp.sort_by
-            ),
+        for comp, score in zip(batch.comps, scores)
+    ]
+    tied = {head for head, n in Counter(heads).items() if n > 1}
+    stats.keys += len(heads)
+    # Unique heads settle every comparison, so they skip the `strxfrm` component
+    keys = [
+        (
+            (*head, _XFRM(comp.sort_by, is_lower=is_lower, stats=stats))
+            if head in tied
+            else head
         )
-        return key
-
-    return key_by
+        for comp, head in zip(batch.comps, heads)
+    ]
+    return keys.__getitem__
 
 
 def _prune(
-    stack: Stack, context: Context, ranked: Iterable[Metric]
-) -> Iterator[Metric]:
+    stack: Stack, context: Context, batch: MetricBatch, ranked: Iterable[int]
+) -> Iterator[int]:
     seen: MutableSet[str] = set()
-    for metric in ranked:
-        p_edit = metric.comp.primary_edit
+    for idx in ranked:
+        p_edit = batch.comps[idx].primary_edit
         if not context.manual and len(seen) > stack.settings.match.max_results:
             break
         elif p_edit.new_text not in seen:
             if not isinstance(p_edit, SnippetEdit):
                 seen.add(p_edit.new_text)
-            yield metric
+            yield idx
 
 
 def _max_width(metrics: Sequence[Metric]) -> int:
@@ -116,7 +196,7 @@ def _cmp_to_vcmp(
 
 
 def trans(
-    stack: Stack, pum_width: int, context: Context, metrics: Sequence[Metric]
+    stack: Stack, pum_width: int, context: Context, batch: MetricBatch
 ) -> Iterator[Tuple[Metric, VimCompletion]]:
     s = state()
     scr_width, _ = s.screen
@@ -129,10 +209,23 @@ def trans(
     ellipsis_width = display_width(display.pum.ellipsis, tabsize=context.tabstop)
     truncate = clamp(pum_width, scr_width - context.scr_col, display.pum.x_max_len)
 
-    w_adjust = _cum(stack.settings.weights, metrics=metrics)
-    sortby = _sort_by(context.is_lower, adjustment=w_adjust)
-    ranked = sorted(metrics, key=sortby)
-    pruned = tuple(_prune(stack, context=context, ranked=ranked))
+    w_adjust = _cum(stack.settings.weights, batch=batch)
+    scores = _scores(w_adjust, batch=batch)
+    _XFRM.refresh()
+    stats = _XfrmStats()
+    sortby = _sort_by(context.is_lower, batch=batch, scores=scores, stats=stats)
+    rows = range(len(batch.comps))
+    with timeit("RANK", stats):
+        # `_prune` stops early unless manual, so only pay for what it consumes
+        ranked = (
+            sorted(rows, key=sortby)
+            if context.manual
+            else lazy_sorted(rows, key=sortby)
+        )
+        pruned = tuple(
+            batch.metric(idx)
+            for idx in _prune(stack, context=context, batch=batch, ranked=ranked)
+        )
     max_width = _max_width(pruned)
     for metric in pruned:
         yield metric, _cmp_to_vcmp(
@@ -1,33 +1,63 @@
 from asyncio import create_task, gather, wrap_future
 from concurrent.futures import Future, InvalidStateError
 from contextlib import suppress
+from enum import Enum, auto
 from functools import lru_cache
-from queue import SimpleQueue
+from itertools import count
+from queue import PriorityQueue
 from shutil import which
 from subprocess import CalledProcessError
-from threading import Thread
+from threading import Lock, Thread
+from time import monotonic
 from typing import Any, Awaitable, Callable, Sequence, TypeVar, cast
 
 from pynvim_pp.logging import suppress_and_log
 from std2.asyncio.subprocess import call
 
+from .timeit import record
+
 _T = TypeVar("_T")
 
 
-class SingleThreadExecutor:
+class Lane(Enum):
+    interactive = auto()
+    background = auto()
+
+
+class DBExecutor:
+    """
+    One thread per database
+
+    Queued interactive work always runs before queued background work,
+    already running work is never preempted
+    """
+
     def __init__(self) -> None:
-        self._q: SimpleQueue = SimpleQueue()
+        self._q: PriorityQueue = PriorityQueue()
+        self._seq = count()
+        self._depth_lock = Lock()
+        self._depth = {lane: 0 for lane in Lane}
 
         def cont() -> None:
             while True:
                 with suppress_and_log():
-                    f = self._q.get()
+                    _, _, lane, t0, f = self._q.get()
+                    with self._depth_lock:
+                        self._depth[lane] -= 1
+                        depth = self._depth[lane]
+                    record(
+                        f"DB WAIT -- {lane.name}",
+                        monotonic() - t0,
+                        f"queued :: {depth}",
+                    )
                     f()
 
         self._th = Thread(daemon=True, target=cont)
         self._th.start()
 
-    def _submit(self, f: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    def _submit(
+        self, lane: Lane, f: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Future:
         fut: Future = Future()
 
         def cont() -> None:
@@ -40,16 +70,23 @@ class SingleThreadExecutor:
                 with suppress(InvalidStateError):
                     fut.set_result(ret)
 
-        self._q.put(cont)
+        with self._depth_lock:
+            self._depth[lane] += 1
+        self._q.put((lane.value, next(self._seq), lane, monotonic(), cont))
         return fut
 
     def ssubmit(self, f: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
-        fut = self._submit(f, *args, **kwargs)
+        fut = self._submit(Lane.interactive, f, *args, **kwargs)
         result = cast(_T, fut.result())
         return result
 
     def submit(self, f: Callable[..., _T], *args: Any, **kwargs: Any) -> Awaitable[_T]:
-        return wrap_future(self._submit(f, *args, **kwargs))
+        return wrap_future(self._submit(Lane.interactive, f, *args, **kwargs))
+
+    def background(
+        self, f: Callable[..., _T], *args: Any, **kwargs: Any
+    ) -> Awaitable[_T]:
+        return wrap_future(self._submit(Lane.background, f, *args, **kwargs))
 
 
 @lru_cache(maxsize=None)
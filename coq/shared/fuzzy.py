@@ -1,7 +1,17 @@
 from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import repeat
-from typing import Iterable, MutableMapping, MutableSequence, Tuple
+from math import floor
+from typing import (
+    Iterable,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 
 @dataclass(frozen=True)
@@ -41,6 +51,27 @@ def multi_set_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
         return ratio / adjust
 
 
+class QueryProfile:
+    """
+    Query side of `quick_ratio`, compiled once per select
+    """
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self._counts: MutableMapping[Tuple[int, int], Mapping[str, int]] = {}
+
+    def counts(self, lo: int, hi: int) -> Mapping[str, int]:
+        key = lo, min(hi, len(self.query))
+        if (counts := self._counts.get(key)) is None:
+            counts = self._counts[key] = Counter(self.query[lo:hi])
+        return counts
+
+
+@lru_cache(maxsize=64)
+def query_profile(query: str) -> QueryProfile:
+    return QueryProfile(query)
+
+
 def quick_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
     """
     Front end bias
@@ -58,39 +89,70 @@ def quick_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
         return l_ratio + r_ratio * 0.5
 
 
-_ARRAY_CACHE: MutableMapping[Tuple[int, int], MutableSequence[int]] = {}
-_DA: MutableMapping[str, int] = {}
+def profiled_ratio(profile: QueryProfile, rhs: str, look_ahead: int) -> float:
+    """
+    Same as `quick_ratio`, only touches `rhs` per call
+    """
+
+    lhs = profile.query
+    shorter = min(len(lhs), len(rhs))
+    if not shorter:
+        return 1
+    else:
+        p_matches = _p_matches(lhs, rhs)
+        l_ratio = p_matches / shorter
+
+        rest = shorter - p_matches
+        if not rest:
+            ms_ratio = 1.0
+        else:
+            hi = p_matches + rest + look_ahead
+            budget = {**profile.counts(p_matches, hi)}
+            inter = 0
+            for char in rhs[p_matches:hi]:
+                if budget.get(char, 0) > 0:
+                    budget[char] -= 1
+                    inter += 1
+
+            longer = min(max(len(lhs), len(rhs)), hi) - p_matches
+            ratio = 1 - (longer - inter) / longer
+            adjust = rest / longer
+            ms_ratio = ratio / adjust
+
+        return l_ratio + ms_ratio * (1 - l_ratio) * 0.5
 
 
-def dl_distance(lhs: str, rhs: str) -> int:
+_BIT_WIDTH = 64
+
+
+def _dl(lhs: str, rhs: str, max_d: int) -> int:
     """
     Modified from
     https://github.com/jamesturk/jellyfish/blob/main/LICENSE
     Dont sue me
+
+    Only the diagonal band of width `max_d` is filled,
+    returns `max_d + 1` once the distance is known to exceed `max_d`
     """
 
     len_l, len_r = len(lhs), len(rhs)
     row_size = len_r + 2
-    max_d = len_l + len_r
-    _DA.clear()
+    inf = max_d + 1
+    da: MutableMapping[str, int] = {}
 
-    if not (d := _ARRAY_CACHE.get((len_l, len_r))):
-        d = [*repeat(0, row_size * (len_l + 2))]
+    d = [*repeat(inf, row_size * (len_l + 2))]
 
-    d[0] = max_d
     for i in range(0, len_l + 1):
-        i1 = i + 1
-        d[row_size * i1] = max_d
-        d[row_size * i1 + 1] = i
+        d[row_size * (i + 1) + 1] = i
 
     for j in range(0, len_r + 1):
-        d[j + 1] = max_d
         d[row_size + j + 1] = j
 
     for i in range(1, len_l + 1):
         db = 0
-        for j in range(1, len_r + 1):
-            i1 = _DA.get(rhs[j - 1], 0)
+        row_min = i
+        for j in range(max(1, i - max_d), min(len_r, i + max_d) + 1):
+            i1 = da.get(rhs[j - 1], 0)
             j1 = db
 
             if lhs[i - 1] == rhs[j - 1]:
@@ -99,20 +161,107 @@ def dl_distance(lhs: str, rhs: str) -> int:
             else:
                 cost = 1
 
-            d[row_size * (i + 1) + j + 1] = min(
+            d[row_size * (i + 1) + j + 1] = cell = min(
                 d[row_size * i + j] + cost,
                 d[row_size * (i + 1) + j] + 1,
                 d[row_size * i + j + 1] + 1,
                 d[row_size * i1 + j1] + (i - i1 - 1) + 1 + (j - j1 - 1),
             )
-        _DA[lhs[i - 1]] = i
+            row_min = min(row_min, cell)
+        da[lhs[i - 1]] = i
+
+        if row_min > max_d:
+            return inf
 
-    return d[row_size * (len_l + 1) + len_r + 1]
+    return min(inf, d[row_size * (len_l + 1) + len_r + 1])
 
 
-def metrics(lhs: str, rhs: str, look_ahead: int) -> MatchMetrics:
+def _bits(lhs: str, rhs: str, max_d: int) -> int:
+    """
+    Hyyrö's bit-vector algorithm for restricted Damerau-Levenshtein,
+    ie. optimal string alignment
+
+    Returns `max_d + 1` once the distance is known to exceed `max_d`
+    """
+
+    if len(lhs) > len(rhs):
+        lhs, rhs = rhs, lhs
+
+    len_l, remaining = len(lhs), len(rhs)
+    if not len_l:
+        return min(max_d + 1, remaining)
+
+    peq: MutableMapping[str, int] = {}
+    for i, char in enumerate(lhs):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    mask = (1 << len_l) - 1
+    last = 1 << (len_l - 1)
+    vp, vn, d0, pm_prev = mask, 0, 0, 0
+    dist = len_l
+
+    for char in rhs:
+        pm = peq.get(char, 0)
+        tr = ((~d0 & pm) << 1) & pm_prev
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & mask
+        hp = vn | (~(d0 | vp) & mask)
+        hn = d0 & vp
+
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+
+        remaining -= 1
+        if dist - remaining > max_d:
+            return max_d + 1
+
+        hp = (hp << 1) | 1
+        hn = hn << 1
+        vp = (hn | ~(d0 | hp)) & mask
+        vn = hp & d0 & mask
+        pm_prev = pm
+
+    return dist
+
+
+def dl_distance(lhs: str, rhs: str) -> int:
+    return _dl(lhs, rhs, max_d=len(lhs) + len(rhs))
+
+
+def bit_distance(lhs: str, rhs: str) -> int:
+    return _bits(lhs, rhs, max_d=len(lhs) + len(rhs))
+
+
+def bounded_distance(lhs: str, rhs: str, max_d: int) -> Optional[int]:
+    """
+    `None` if the distance exceeds `max_d`
+    """
+
+    if abs(len(lhs) - len(rhs)) > max_d:
+        return None
+    else:
+        kernel = _bits if min(len(lhs), len(rhs)) <= _BIT_WIDTH else _dl
+        dist = kernel(lhs, rhs, max_d=max_d)
+        return None if dist > max_d else dist
+
+
+def edit_distance(lhs: str, rhs: str) -> int:
+    if min(len(lhs), len(rhs)) <= _BIT_WIDTH:
+        return bit_distance(lhs, rhs)
+    else:
+        return dl_distance(lhs, rhs)
+
+
+def metrics(
+    lhs: str, rhs: str, look_ahead: int, fuzzy_cutoff: Optional[float] = None
+) -> MatchMetrics:
     """
     Front end bias
+
+    With `fuzzy_cutoff`, candidates that cannot reach it are scored as if
+    just past the distance bound, an upper bound still under the cutoff,
+    the rest score the same as without
     """
 
     shorter = min(len(lhs), len(rhs))
@@ -124,6 +273,35 @@ def metrics(lhs: str, rhs: str, look_ahead: int) -> MatchMetrics:
         more = cutoff - shorter
         l, r = lhs[p_matches:cutoff], rhs[p_matches:cutoff]
 
-        dist = dl_distance(l, r)
+        if fuzzy_cutoff is None:
+            dist = edit_distance(l, r)
+        else:
+            # rounded so that `(1 - 0.9) * 20` does not floor to `1`
+            slack = round((1 - fuzzy_cutoff) * shorter, 9)
+            max_d = more + max(0, floor(slack))
+            bounded = bounded_distance(l, r, max_d=max_d)
+            dist = max_d + 1 if bounded is None else bounded
+
         edit_dist = 1 - (dist - more) / shorter
         return MatchMetrics(prefix_matches=p_matches, edit_distance=edit_dist)
+
+
+def metrics_batch(
+    cword: str,
+    candidates: Iterable[str],
+    look_ahead: int,
+    fuzzy_cutoff: Optional[float] = None,
+) -> Sequence[MatchMetrics]:
+    """
+    Score a whole column of candidates against the same `cword`
+    """
+
+    memo: MutableMapping[str, MatchMetrics] = {}
+    acc: MutableSequence[MatchMetrics] = []
+    for candidate in candidates:
+        if (m := memo.get(candidate)) is None:
+            m = memo[candidate] = metrics(
+                cword, candidate, look_ahead=look_ahead, fuzzy_cutoff=fuzzy_cutoff
+            )
+        acc.append(m)
+    return acc
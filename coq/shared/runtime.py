@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import sys
 from abc import abstractmethod
-from asyncio import CancelledError, Condition, Task, as_completed, create_task, wait
+from asyncio import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Condition,
+    Task,
+    as_completed,
+    create_task,
+    sleep,
+    wait,
+)
 from dataclasses import dataclass
 from pathlib import Path
 from time import monotonic
@@ -9,11 +19,17 @@ from typing import (
     Any,
     AsyncIterator,
     Awaitable,
+    Callable,
     Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
     MutableSequence,
     Optional,
     Protocol,
     Sequence,
+    Tuple,
     TypeVar,
 )
 from uuid import UUID, uuid4
@@ -23,6 +39,7 @@ from pynvim_pp.logging import suppress_and_log
 from std2.aitertools import aenumerate
 from std2.asyncio import cancel
 
+from .lru import LRU
 from .settings import (
     BaseClient,
     CompleteOptions,
@@ -38,15 +55,77 @@ _T = TypeVar("_T")
 _T_co = TypeVar("_T_co", contravariant=True)
 _O_co = TypeVar("_O_co", contravariant=True, bound=BaseClient)
 
+# Sources with a median latency past this many auto timeouts are skipped
+_SLOW = 3
+# Deadline of a source as a multiple of its 95th percentile latency
+_HEADROOM = 2
+# Seconds between probes of a source that misses the auto timeout
+_PROBE_INTERVAL = 9.0
+# Seconds before a running probe is taken as hung, cancelled and redone
+_PROBE_TIMEOUT = 99.0
+
+
+@dataclass(frozen=True)
+class Latency:
+    q50_duration: float
+    q95_duration: float
+
+
+# Hot type, `dataclass(slots=...)` is py3.10+, spelt out for mypy
+if sys.version_info >= (3, 10):
+
+    @dataclass(frozen=True, slots=True)
+    class Metric:
+        instance: UUID
+        comp: Completion
+        weight_adjust: float
+        weight: Weights
+        label_width: int
+        kind_width: int
+
+else:
+
+    @dataclass(frozen=True)
+    class Metric:
+        instance: UUID
+        comp: Completion
+        weight_adjust: float
+        weight: Weights
+        label_width: int
+        kind_width: int
+
 
 @dataclass(frozen=True)
-class Metric:
-    instance: UUID
-    comp: Completion
-    weight_adjust: float
-    weight: Weights
-    label_width: int
-    kind_width: int
+class MetricBatch:
+    """
+    Columns of `Metric`, one row per completion
+    """
+
+    instances: Sequence[UUID]
+    comps: Sequence[Completion]
+    prefix_matches: Sequence[float]
+    edit_distance: Sequence[float]
+    recency: Sequence[float]
+    proximity: Sequence[float]
+    weight_adjust: Sequence[float]
+    label_width: Sequence[int]
+    kind_width: Sequence[int]
+
+    def metric(self, idx: int) -> Metric:
+        weight = Weights(
+            prefix_matches=self.prefix_matches[idx],
+            edit_distance=self.edit_distance[idx],
+            recency=self.recency[idx],
+            proximity=self.proximity[idx],
+        )
+        return Metric(
+            instance=self.instances[idx],
+            comp=self.comps[idx],
+            weight_adjust=self.weight_adjust[idx],
+            weight=weight,
+            label_width=self.label_width[idx],
+            kind_width=self.kind_width[idx],
+        )
 
 
 class PReviewer(Protocol[_T]):
@@ -59,15 +138,44 @@ class PReviewer(Protocol[_T]):
     async def s_begin(self, token: _T, assoc: BaseClient, instance: UUID) -> None:
         ...
 
-    def trans(self, token: _T, instance: UUID, completion: Completion) -> Metric:
+    def trans(
+        self, token: _T, batches: Iterable[Tuple[UUID, Iterable[Completion]]]
+    ) -> MetricBatch:
+        ...
+
+    def refine(self, context: Context, batch: MetricBatch) -> MetricBatch:
         ...
 
     async def s_end(
-        self, instance: UUID, interrupted: bool, elapsed: float, items: int
+        self,
+        instance: UUID,
+        interrupted: bool,
+        truncated: bool,
+        elapsed: float,
+        items: int,
     ) -> None:
         ...
 
 
+def _extends(prev: Context, cur: Context) -> bool:
+    """
+    `cur` is `prev` plus more word chars typed in place
+    """
+
+    (p_row, _), (c_row, _) = prev.position, cur.position
+    typed = cur.words_before[len(prev.words_before) :]
+    return (
+        not cur.manual
+        and cur.commit_id == prev.commit_id
+        and cur.buf_id == prev.buf_id
+        and c_row == p_row
+        and cur.line_after == prev.line_after
+        and bool(typed)
+        and cur.words_before == prev.words_before + typed
+        and cur.line_before == prev.line_before + typed
+    )
+
+
 class Supervisor:
     def __init__(
         self,
@@ -88,6 +196,12 @@ class Supervisor:
 
         self._lock = TracingLocker(name="Supervisor", force=True)
         self._work_task: Optional[Task] = None
+        self._last: Optional[Tuple[Context, MetricBatch]] = None
+        self._prefetched: LRU[Tuple[int, int, str], Tuple[Context, MetricBatch]] = LRU(
+            size=9
+        )
+        self._latencies: Mapping[str, Latency] = {}
+        self._probes: MutableMapping[str, Tuple[float, Task]] = {}
 
     async def register(self, worker: Worker, assoc: BaseClient) -> None:
         with suppress_and_log():
@@ -104,7 +218,85 @@ class Supervisor:
         if task:
             await cancel(task)
 
-    def collect(self, context: Context) -> Awaitable[Sequence[Metric]]:
+    def learn(self, latencies: Mapping[str, Latency]) -> None:
+        self._latencies = latencies
+
+    def _deadline(self, name: str, timeout: float, now: float) -> Optional[float]:
+        """
+        Per source auto complete deadline, `None` to skip the source, `0` to probe
+
+        Interrupted runs only record a lower bound, so sources that usually
+        miss the budget are periodically probed: run without a deadline and
+        never waited on, to learn their real latency,
+        a probe still running after `_PROBE_TIMEOUT` is taken as hung and replaced
+        """
+
+        if not (latency := self._latencies.get(name)):
+            return timeout
+        elif latency.q50_duration < timeout:
+            return min(timeout, max(latency.q95_duration * _HEADROOM, timeout / 4))
+        else:
+            probed, probe = self._probes.get(name, (0, None))
+            if probe and not probe.done():
+                if now - probed > _PROBE_TIMEOUT:
+                    probe.cancel()
+                    return 0
+                else:
+                    return None
+            elif now - probed >= _PROBE_INTERVAL:
+                return 0
+            elif latency.q50_duration > timeout * _SLOW:
+                return None
+            else:
+                return timeout
+
+    def _cached(self, context: Context) -> Iterator[Tuple[Context, MetricBatch]]:
+        if last := self._last:
+            yield last
+
+        row, _ = context.position
+        for idx in reversed(range(len(context.words_before))):
+            key = context.buf_id, row, context.words_before[:idx]
+            if prefetched := self._prefetched.get(key):
+                yield prefetched
+
+    def refine(self, context: Context) -> Optional[MetricBatch]:
+        """
+        Rescore the last collect, or a prefetch, locally,
+        if `context` only extends it
+        """
+
+        for prev, batch in self._cached(context):
+            if _extends(prev, cur=context):
+                with timeit("REFINE -- ALL"):
+                    refined = self._reviewer.refine(context, batch=batch)
+                return refined if refined.comps else None
+        else:
+            return None
+
+    async def prefetch(self, context: Context) -> None:
+        """
+        Speculative collect at idle, yields to any real one
+        """
+
+        if (task := self._work_task) and not task.done():
+            return
+        else:
+            row, _ = context.position
+            key = context.buf_id, row, context.words_before
+            batch = await self.collect(context)
+            if batch.comps:
+                self._prefetched[key] = context, batch
+
+    def collect(
+        self,
+        context: Context,
+        progress: Optional[Callable[[MetricBatch], Awaitable[None]]] = None,
+    ) -> Awaitable[MetricBatch]:
+        """
+        With `progress`, it receives an early batch once the quorum has returned
+        """
+
         now = monotonic()
         timeout = (
             self.limits.completion_manual_timeout
@@ -112,30 +304,75 @@ class Supervisor:
             else self.limits.completion_auto_timeout
         )
 
-        async def cont(prev: Optional[Task]) -> Sequence[Metric]:
+        async def cont(prev: Optional[Task]) -> MetricBatch:
             with timeit("CANCEL -- ALL"):
                 if prev:
                     await cancel(prev)
 
             with suppress_and_log(), timeit("COLLECTED -- ALL"):
                 async with self._lock:
-                    acc: MutableSequence[Metric] = []
+                    acc: MutableSequence[Tuple[UUID, Sequence[Completion]]] = []
 
                     token = await self._reviewer.begin(context)
-                    tasks = tuple(
-                        worker.supervised(context, token=token, now=now, acc=acc)
-                        for worker in self._workers
+                    supervised: MutableMapping[Worker, Tuple[Task, float]] = {}
+                    for worker in self._workers:
+                        name = worker._options.short_name
+                        deadline = (
+                            timeout
+                            if context.manual
+                            else self._deadline(name, timeout=timeout, now=now)
+                        )
+                        if deadline is not None:
+                            task = worker.supervised(
+                                context, token=token, now=now, acc=acc
+                            )
+                            if deadline:
+                                supervised[worker] = task, deadline
+                            else:
+                                self._probes[name] = now, task
+
+                    tasks = tuple(task for task, _ in supervised.values())
+                    quorum = tuple(
+                        task
+                        for worker, (task, _) in supervised.items()
+                        if worker._options.short_name in self.comp.quorum
                     )
 
-                    _, pending = await wait(tasks, timeout=timeout)
-                    if not acc:
+                    if progress and quorum and len(quorum) < len(tasks):
+                        _, waiting = await wait(quorum, timeout=timeout)
+                        late = any(not task.done() for task in tasks)
+                        if not waiting and late and any(comps for _, comps in acc):
+                            with timeit("REVIEW -- QUORUM"):
+                                early = self._reviewer.trans(token, batches=acc)
+                            await progress(early)
+
+                    pending = {*tasks}
+                    while pending:
+                        horizon = max(
+                            deadline
+                            for task, deadline in supervised.values()
+                            if task in pending
+                        )
+                        if (left := horizon - (monotonic() - now)) <= 0:
+                            break
+                        else:
+                            _, pending = await wait(
+                                pending, timeout=left, return_when=FIRST_COMPLETED
+                            )
+
+                    if not any(comps for _, comps in acc):
                         for fut in as_completed(pending):
                             await fut
-                            if acc:
+                            if any(comps for _, comps in acc):
                                 break
 
                     await cancel(*pending)
-                    return acc
+
+                    with timeit("REVIEW -- ALL"):
+                        batch = self._reviewer.trans(token, batches=acc)
+
+                    self._last = context, batch
+                    return batch
 
         self._work_task = task = create_task(cont(self._work_task))
         return task
@@ -157,13 +394,15 @@ class Worker(Generic[_O_co, _T_co]):
         context: Context,
         token: Any,
         now: float,
-        acc: MutableSequence[Metric],
+        acc: MutableSequence[Tuple[UUID, Sequence[Completion]]],
     ) -> Task:
         prev = self._work_task
 
         async def cont() -> None:
             instance, items = uuid4(), 0
-            interrupted = False
+            interrupted = truncated = False
+            comps: MutableSequence[Completion] = []
+            limits = self._supervisor.limits
 
             with timeit(f"CANCEL WORKER -- {self._options.short_name}"):
                 if prev:
@@ -174,21 +413,27 @@ class Worker(Generic[_O_co, _T_co]):
                     token, assoc=self._options, instance=instance
                 )
                 try:
+                    yield_at = monotonic() + limits.worker_time_slice
                     async for items, completion in aenumerate(
                         self.work(context), start=1
                     ):
-                        metric = self._supervisor._reviewer.trans(
-                            token, instance=instance, completion=completion
-                        )
-                        acc.append(metric)
+                        comps.append(completion)
+                        if items >= limits.worker_item_limit:
+                            truncated = True
+                            break
+                        elif monotonic() >= yield_at:
+                            await sleep(0)
+                            yield_at = monotonic() + limits.worker_time_slice
                 except CancelledError:
                     interrupted = True
                     raise
                 finally:
+                    acc.append((instance, comps))
                     elapsed = monotonic() - now
                     await self._supervisor._reviewer.s_end(
                         instance,
                         interrupted=interrupted,
+                        truncated=truncated,
                         elapsed=elapsed,
                         items=items,
                     )
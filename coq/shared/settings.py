@@ -12,6 +12,8 @@ class Limits:
     idle_timeout: float
     completion_auto_timeout: float
     completion_manual_timeout: float
+    worker_item_limit: int
+    worker_time_slice: float
     download_retries: int
     download_timeout: float
 
@@ -110,6 +112,7 @@ class CompleteOptions:
     replace_prefix_threshold: int
     replace_suffix_threshold: int
     skip_after: AbstractSet[str]
+    quorum: AbstractSet[str]
 
 
 @dataclass(frozen=True)
@@ -158,10 +161,19 @@ class PathsClient(BaseClient, _AlwaysTop):
     path_seps: AbstractSet[str]
 
 
+class BuffersBackend(Enum):
+    sqlite = auto()
+    memory = auto()
+
+
 @dataclass(frozen=True)
 class BuffersClient(_WordbankClient, _AlwaysTop):
     same_filetype: bool
     parent_scope: str
+    backend: BuffersBackend
+    index_chunk_size: int
+    index_interval: float
+    index_budget: int
 
 
 @dataclass(frozen=True)
@@ -292,4 +304,5 @@ EMPTY_COMP = CompleteOptions(
     replace_prefix_threshold=0,
     replace_suffix_threshold=0,
     skip_after=set(),
+    quorum=set(),
 )
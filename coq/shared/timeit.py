@@ -21,6 +21,30 @@ from ..consts import DEBUG
 _RECORDS: MutableMapping[str, Tuple[int, float]] = {}
 
 
+def _record(name: str, delta: float, *args: Any, force: bool) -> None:
+    times, cum = _RECORDS.get(name, (0, 0))
+    tt, c = times + 1, cum + delta
+    _RECORDS[name] = tt, c
+
+    label = name.ljust(50)
+    time = f"{si_prefixed_smol(delta, precision=0)}s".ljust(8)
+    ttime = f"{si_prefixed_smol(c / tt, precision=0)}s".ljust(8)
+    msg = f"TIME -- {label} :: {time} @ {ttime} {' '.join(map(str, args))}"
+    if force:
+        log.info("%s", msg)
+    else:
+        log.debug("%s", msg)
+
+
+def record(name: str, delta: float, *args: Any, force: bool = False) -> None:
+    """
+    Same as `timeit`, for spans that do not fit a `with` block
+    """
+
+    if DEBUG or force:
+        _record(name, delta, *args, force=force)
+
+
 @contextmanager
 def timeit(
     name: str, *args: Any, force: bool = False, warn: Optional[float] = None
@@ -30,18 +54,7 @@ def timeit(
             yield None
         delta = t().total_seconds()
         if DEBUG or force or delta >= (warn or 0):
-            times, cum = _RECORDS.get(name, (0, 0))
-            tt, c = times + 1, cum + delta
-            _RECORDS[name] = tt, c
-
-            label = name.ljust(50)
-            time = f"{si_prefixed_smol(delta, precision=0)}s".ljust(8)
-            ttime = f"{si_prefixed_smol(c / tt, precision=0)}s".ljust(8)
-            msg = f"TIME -- {label} :: {time} @ {ttime} {' '.join(map(str, args))}"
-            if force:
-                log.info("%s", msg)
-            else:
-                log.debug("%s", msg)
+            _record(name, delta, *args, force=force)
     else:
         yield None
 
@@ -1,5 +1,6 @@
+from heapq import heapify, heappop
 from itertools import chain, repeat
-from typing import AbstractSet, Iterable, Iterator
+from typing import AbstractSet, Any, Callable, Iterable, Iterator, TypeVar
 
 from pynvim_pp.text_object import is_word
 from std2.string import removesuffix
@@ -10,6 +11,20 @@ from .fuzzy import multi_set_ratio
 from .parse import coalesce, lower
 from .types import Context, ContextualEdit
 
+_T = TypeVar("_T")
+
+
+def lazy_sorted(items: Iterable[_T], key: Callable[[_T], Any]) -> Iterator[_T]:
+    """
+    Same order as `sorted`, but only pays `log n` per item actually consumed
+    """
+
+    heap = [(key(item), idx, item) for idx, item in enumerate(items)]
+    heapify(heap)
+    while heap:
+        _, _, item = heappop(heap)
+        yield item
+
 
 def reverse_acc(replace_prefix_threshold: int, seq: str) -> Iterator[str]:
     def cont() -> Iterator[str]:
@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path, PurePath
@@ -175,20 +176,43 @@ class ExternPath:
     path: Path
 
 
-@dataclass(frozen=True)
-class Completion:
-    source: str
-    always_on_top: bool
-    weight_adjust: float
-    label: str
-    sort_by: str
-    primary_edit: Edit
-    adjust_indent: bool
-    icon_match: Optional[str]
-
-    uid: UUID = field(default_factory=uuid4)
-    secondary_edits: Sequence[RangeEdit] = ()
-    preselect: bool = False
-    kind: str = ""
-    doc: Optional[Doc] = None
-    extern: Union[ExternLSP, ExternLUA, ExternPath, None] = None
+# Hot type, `dataclass(slots=...)` is py3.10+, spelt out for mypy
+if sys.version_info >= (3, 10):
+
+    @dataclass(frozen=True, slots=True)
+    class Completion:
+        source: str
+        always_on_top: bool
+        weight_adjust: float
+        label: str
+        sort_by: str
+        primary_edit: Edit
+        adjust_indent: bool
+        icon_match: Optional[str]
+
+        uid: UUID = field(default_factory=uuid4)
+        secondary_edits: Sequence[RangeEdit] = ()
+        preselect: bool = False
+        kind: str = ""
+        doc: Optional[Doc] = None
+        extern: Union[ExternLSP, ExternLUA, ExternPath, None] = None
+
+else:
+
+    @dataclass(frozen=True)
+    class Completion:
+        source: str
+        always_on_top: bool
+        weight_adjust: float
+        label: str
+        sort_by: str
+        primary_edit: Edit
+        adjust_indent: bool
+        icon_match: Optional[str]
+
+        uid: UUID = field(default_factory=uuid4)
+        secondary_edits: Sequence[RangeEdit] = ()
+        preselect: bool = False
+        kind: str = ""
+        doc: Optional[Doc] = None
+        extern: Union[ExternLSP, ExternLUA, ExternPath, None] = None
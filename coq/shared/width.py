@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+from pynvim_pp.lib import display_width as _display_width
+
+
+@lru_cache(maxsize=9999)
+def _memo(text: str, tabsize: int) -> int:
+    return int(_display_width(text, tabsize=tabsize))
+
+
+def display_width(text: str, tabsize: int) -> int:
+    """
+    Printable ASCII is one cell per char, everything else is memoized
+    """
+
+    if text.isascii() and text.isprintable():
+        return len(text)
+    else:
+        return _memo(text, tabsize=tabsize)
@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from ....coq.clients.buffers.worker import _charge, _coverage, _Coverage
+
+
+class Coverage(TestCase):
+    def test_1(self) -> None:
+        cov = _coverage(None, tick=1, line_count=9, chunk_size=3)
+        self.assertEqual(cov, _Coverage(tick=1, lo=0, sizes=(), size=0))
+
+    def test_2(self) -> None:
+        cov = _Coverage(tick=1, lo=3, sizes=(6,), size=6)
+        self.assertEqual(_coverage(cov, tick=2, line_count=9, chunk_size=3), cov)
+
+    def test_3(self) -> None:
+        cov = _Coverage(tick=1, lo=9, sizes=(1, 2, 3), size=6)
+        self.assertEqual(_coverage(cov, tick=1, line_count=9, chunk_size=3), cov)
+
+    def test_4(self) -> None:
+        cov = _Coverage(tick=1, lo=9, sizes=(1, 2, 3), size=6)
+        self.assertEqual(
+            _coverage(cov, tick=2, line_count=9, chunk_size=3),
+            _Coverage(tick=2, lo=0, sizes=(1, 2, 3), size=6),
+        )
+
+    def test_5(self) -> None:
+        cov = _Coverage(tick=1, lo=9, sizes=(1, 2, 3), size=6)
+        self.assertEqual(
+            _coverage(cov, tick=2, line_count=4, chunk_size=3),
+            _Coverage(tick=2, lo=0, sizes=(1, 2), size=3),
+        )
+
+    def test_6(self) -> None:
+        cov = _Coverage(tick=0, lo=0, sizes=(1, 2, 3), size=6)
+        self.assertEqual(
+            _coverage(cov, tick=2, line_count=9, chunk_size=3),
+            _Coverage(tick=2, lo=0, sizes=(1, 2, 3), size=6),
+        )
+
+
+class Charge(TestCase):
+    def test_1(self) -> None:
+        cov = _charge(None, lo=2, lines=("a", "bb", "ccc"), chunk_size=3)
+        self.assertEqual(cov, _Coverage(tick=0, lo=0, sizes=(1, 5), size=6))
+
+    def test_2(self) -> None:
+        cov = _Coverage(tick=1, lo=9, sizes=(9, 1, 9), size=19)
+        self.assertEqual(
+            _charge(cov, lo=3, lines=("aa", "bb"), chunk_size=3),
+            _Coverage(tick=1, lo=9, sizes=(9, 4, 9), size=22),
+        )
+
+    def test_3(self) -> None:
+        cov = _Coverage(tick=1, lo=3, sizes=(9,), size=9)
+        self.assertEqual(_charge(cov, lo=0, lines=(), chunk_size=3), cov)
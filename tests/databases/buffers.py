@@ -0,0 +1,460 @@
+from asyncio import run
+from contextlib import closing
+from dataclasses import replace
+from itertools import cycle
+from os import environ
+from random import Random
+from sqlite3 import Connection, Row
+from string import ascii_lowercase
+from sys import stderr
+from time import perf_counter
+from typing import Mapping, MutableSequence, Sequence, Tuple
+from unittest import TestCase, skipUnless
+
+from ...coq.databases.buffers.database import BDB, _setlines
+from ...coq.databases.buffers.memory import MemoryBDB
+from ...coq.databases.buffers.sql import sql
+from ...coq.databases.buffers.types import PBDB, Update
+from ...coq.databases.ngrams.index import NGramIndex, init_ngrams
+from ...coq.shared.settings import MatchOptions
+from ...coq.shared.sql import BIGGEST_INT, init_db, like_esc
+
+_GROUPED = """
+SELECT
+  word
+FROM (
+  SELECT
+    words.word,
+    words.lword
+  FROM buffers
+  JOIN lines
+    ON lines.buffer_id = buffers.rowid
+  JOIN words
+    ON words.line_id = lines.rowid
+  GROUP BY
+    words.word
+  HAVING
+    words.word <> ''
+)
+WHERE
+  lword LIKE :like_word ESCAPE '!'
+  AND
+  LENGTH(word) + :look_ahead >= LENGTH(:word)
+  AND
+  word <> SUBSTR(:word, 1, LENGTH(word))
+  AND
+  X_SIMILARITY(LOWER(:word), lword, :look_ahead) > :cut_off
+"""
+
+
+def _conn() -> Connection:
+    conn = Connection(":memory:", isolation_level=None)
+    conn.row_factory = Row
+    init_db(conn)
+    conn.executescript(sql("create", "pragma"))
+    conn.executescript(sql("create", "tables"))
+    init_ngrams(conn)
+    return conn
+
+
+def _set(
+    conn: Connection,
+    positions: MutableSequence[int],
+    lo: int,
+    hi: int,
+    lines: Sequence[str],
+    buf_id: int = 1,
+    filetype: str = "",
+) -> None:
+    with conn, closing(conn.cursor()) as cursor:
+        _setlines(
+            cursor,
+            ngrams=NGramIndex(),
+            positions=positions,
+            unifying_chars=frozenset(),
+            tokenization_limit=999,
+            include_syms=False,
+            buf_id=buf_id,
+            filetype=filetype,
+            filename=f"{buf_id}",
+            lo=lo,
+            hi=hi,
+            lines=lines,
+        )
+
+
+def _corpus(rand: Random, size: int) -> Tuple[Sequence[str], Sequence[str]]:
+    """
+    `size` words, on lines of 10 out of a vocabulary of `size / 10`
+    """
+
+    vocab = tuple(
+        "".join(rand.choices(ascii_lowercase, k=rand.randint(4, 12)))
+        for _ in range(size // 10)
+    )
+    lines = tuple(" ".join(rand.sample(vocab, k=10)) for _ in range(size // 10))
+    return vocab, lines
+
+
+def _params(word: str) -> Mapping:
+    return {
+        "cut_off": 0.5,
+        "look_ahead": 2,
+        "limit": BIGGEST_INT,
+        "filetype": None,
+        "word": word,
+        "sym": "",
+        "like_word": like_esc(word[:2]),
+        "like_sym": like_esc(""),
+    }
+
+
+def _rows(conn: Connection, positions: Sequence[int]) -> Mapping[int, bytes]:
+    cursor = conn.execute("SELECT pos, rowid FROM lines ORDER BY pos")
+    return {positions.index(row["pos"]): row["rowid"] for row in cursor.fetchall()}
+
+
+def _words(conn: Connection) -> Sequence[str]:
+    cursor = conn.execute(
+        """
+        SELECT word FROM words
+        JOIN lines ON lines.rowid = words.line_id
+        ORDER BY lines.pos, word
+        """
+    )
+    return [row["word"] for row in cursor.fetchall()]
+
+
+class SetLines(TestCase):
+    def test_1(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=0, hi=0, lines=("a b", "c", "d e"))
+        before = _rows(conn, positions)
+        _set(conn, positions, lo=0, hi=3, lines=("a b", "c", "d e"))
+        self.assertEqual(_rows(conn, positions), before)
+        self.assertEqual(_words(conn), ["a", "b", "c", "d", "e"])
+
+    def test_2(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=0, hi=0, lines=("a", "b", "c"))
+        before = _rows(conn, positions)
+        _set(conn, positions, lo=0, hi=3, lines=("c", "x", "a", "b"))
+        after = _rows(conn, positions)
+        self.assertEqual(after[0], before[2])
+        self.assertEqual((after[2], after[3]), (before[0], before[1]))
+        self.assertEqual(_words(conn), ["c", "x", "a", "b"])
+
+    def test_3(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=0, hi=0, lines=("a", "b", "c", "d"))
+        before = _rows(conn, positions)
+        _set(conn, positions, lo=1, hi=2, lines=())
+        after = _rows(conn, positions)
+        self.assertEqual([*after.values()], [before[0], before[2], before[3]])
+        self.assertEqual(_words(conn), ["a", "c", "d"])
+
+    def test_4(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=0, hi=0, lines=("a", "z"))
+        for _ in range(99):
+            _set(conn, positions, lo=1, hi=1, lines=("b",))
+        self.assertEqual(sorted(positions), positions)
+        self.assertEqual(len(positions), 101)
+        self.assertEqual(_words(conn), ["a", *("b" for _ in range(99)), "z"])
+
+    def test_5(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=4, hi=6, lines=("e", "f"))
+        self.assertEqual(len(positions), 6)
+        self.assertEqual(sorted(_rows(conn, positions)), [4, 5])
+        _set(conn, positions, lo=0, hi=0, lines=("a", "b"))
+        self.assertEqual(sorted(_rows(conn, positions)), [0, 1, 6, 7])
+
+
+class UniqueWords(TestCase):
+    def test_1(self) -> None:
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        _set(conn, positions, lo=0, hi=0, lines=("a b", "b c", "c"))
+        _set(conn, positions, lo=1, hi=2, lines=("a",))
+        cursor = conn.execute("SELECT word, refcount FROM unique_words ORDER BY word")
+        self.assertEqual(
+            [(row["word"], row["refcount"]) for row in cursor.fetchall()],
+            [("a", 2), ("b", 1), ("c", 1)],
+        )
+        conn.execute("DELETE FROM buffers")
+        cursor = conn.execute("SELECT COUNT(*) AS n FROM unique_words")
+        self.assertEqual(cursor.fetchone()["n"], 0)
+
+    def test_2(self) -> None:
+        conn = _conn()
+        params = {**_params("abcd"), "sym": "x.ab", "like_sym": like_esc("x.")}
+        cursor = conn.execute(f"EXPLAIN QUERY PLAN {sql('select', 'words')}", params)
+        plan = [row["detail"] for row in cursor.fetchall()]
+        self.assertIn(
+            "SEARCH unique_words USING INDEX unique_words_lword (lword=?)", plan
+        )
+        for detail in plan:
+            self.assertNotIn("GROUP BY", detail)
+            for table in ("unique_words", "words", "lines", "buffers"):
+                self.assertFalse(detail.startswith(f"SCAN {table}"), msg=detail)
+
+    def test_3(self) -> None:
+        conn = _conn()
+        _set(conn, [], lo=0, hi=0, lines=("abcde",), buf_id=1, filetype="a")
+        _set(conn, [], lo=0, hi=0, lines=("", "abcde"), buf_id=2, filetype="b")
+        for filetype, filenames in (("a", ["1"]), ("b", ["2"]), ("c", [])):
+            cursor = conn.execute(
+                sql("select", "words"), {**_params("abcd"), "filetype": filetype}
+            )
+            rows = cursor.fetchall()
+            self.assertEqual(
+                [(row["filename"], row["filetype"]) for row in rows],
+                [(filename, filetype) for filename in filenames],
+            )
+
+
+    def test_4(self) -> None:
+        rand = Random(0)
+        vocab, lines = _corpus(rand, size=9999)
+        conn = _conn()
+        positions: MutableSequence[int] = []
+        for lo in range(0, len(lines), 99):
+            _set(conn, positions, lo=lo, hi=lo, lines=lines[lo : lo + 99])
+        for word in vocab[:9]:
+            params = _params(word[:4])
+            grouped = {row["word"] for row in conn.execute(_GROUPED, params)}
+            cursor = conn.execute(sql("select", "words"), params)
+            self.assertEqual({row["word"] for row in cursor.fetchall()}, grouped)
+
+
+class UniqueWordsBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        sizes = (10_000, 100_000, *((1_000_000,) if "COQ_BENCH_1M" in environ else ()))
+        for size in sizes:
+            vocab, lines = _corpus(rand, size=size)
+            conn = _conn()
+            positions: MutableSequence[int] = []
+            for lo in range(0, len(lines), 99):
+                _set(conn, positions, lo=lo, hi=lo, lines=lines[lo : lo + 99])
+            cursor = conn.execute("SELECT COUNT(*) AS n FROM words")
+            self.assertEqual(cursor.fetchone()["n"], size)
+            params = _params(vocab[0][:4])
+
+            t0 = perf_counter()
+            grouped = {row["word"] for row in conn.execute(_GROUPED, params)}
+            t1 = perf_counter()
+            cursor = conn.execute(sql("select", "words"), params)
+            unique = {row["word"] for row in cursor.fetchall()}
+            t2 = perf_counter()
+
+            self.assertEqual(unique, grouped)
+            print(
+                f"words {size} :: GROUP BY {(t1 - t0) * 1000:.2f} -> "
+                f"unique_words {(t2 - t1) * 1000:.2f} ms",
+                file=stderr,
+            )
+
+
+_OPTS = MatchOptions(
+    max_results=33,
+    unifying_chars=frozenset(),
+    exact_matches=2,
+    look_ahead=2,
+    fuzzy_cutoff=0.6,
+)
+
+
+def _backends() -> Sequence[PBDB]:
+    return tuple(
+        backend(999999, unifying_chars=frozenset(), include_syms=False)
+        for backend in (BDB, MemoryBDB)
+    )
+
+
+async def _query(db: PBDB, word: str, sym: str) -> Sequence[str]:
+    words = await db.words(
+        _OPTS, filetype=None, word=word, sym=sym, limitless=True, update=None
+    )
+    return sorted(word.text for word in words)
+
+
+class Backends(TestCase):
+    def test_1(self) -> None:
+        rand = Random(0)
+        vocab, lines = _corpus(rand, size=3000)
+        queries = tuple(rand.choice(vocab)[: rand.randint(1, 6)] for _ in range(33))
+
+        async def cont(db: PBDB) -> Sequence[Sequence[str]]:
+            for buf_id in (1, 2):
+                await db.set_lines(
+                    buf_id, filetype="", filename="", lo=0, hi=0, lines=lines
+                )
+            for _ in range(33):
+                lo = rand.randint(0, len(lines))
+                hi = rand.randint(lo, len(lines))
+                await db.set_lines(
+                    1,
+                    filetype="",
+                    filename="",
+                    lo=lo,
+                    hi=hi,
+                    lines=rand.sample(lines, k=rand.randint(0, 9)),
+                )
+            await db.vacuum({1: len(lines) // 2})
+            return [await _query(db, word=query, sym=f"x.{query}") for query in queries]
+
+        state = rand.getstate()
+        acc = []
+        for db in _backends():
+            rand.setstate(state)
+            acc.append(run(cont(db)))
+
+        sql_words, mem_words = acc
+        self.assertTrue(any(sql_words))
+        self.assertEqual(mem_words, sql_words)
+
+    def test_2(self) -> None:
+        rand = Random(0)
+        vocab, lines = _corpus(rand, size=3000)
+        queries = tuple(rand.choice(vocab)[: rand.randint(1, 6)] for _ in range(33))
+        half = len(lines) // 2
+
+        async def cont(db: PBDB) -> Sequence[Sequence[Tuple[str, str, str]]]:
+            for buf_id, filetype, lo in ((1, "a", 0), (2, "b", half // 2)):
+                await db.set_lines(
+                    buf_id,
+                    filetype=filetype,
+                    filename=f"{buf_id}",
+                    lo=0,
+                    hi=0,
+                    lines=lines[lo : lo + half],
+                )
+            acc = []
+            for query in queries:
+                for filetype in ("a", "b", "c"):
+                    words = await db.words(
+                        _OPTS,
+                        filetype=filetype,
+                        word=query,
+                        sym="",
+                        limitless=True,
+                        update=None,
+                    )
+                    acc.append(sorted((w.text, w.filetype, w.filename) for w in words))
+            return acc
+
+        sql_words, mem_words = (run(cont(db)) for db in _backends())
+        self.assertTrue(any(sql_words))
+        self.assertEqual(mem_words, sql_words)
+        for words, filetype in zip(sql_words, cycle(("a", "b", "c"))):
+            for _, ft, _ in words:
+                self.assertEqual(ft, filetype)
+
+
+class TokenizationLimit(TestCase):
+    def test_1(self) -> None:
+        lines = tuple(
+            " ".join(f"w{ascii_lowercase[row]}{col}" for col in range(3))
+            for row in range(20)
+        )
+        opts = replace(_OPTS, exact_matches=1, fuzzy_cutoff=0)
+
+        async def cont(db: PBDB) -> Sequence[str]:
+            for _ in range(30):
+                await db.set_lines(
+                    1, filetype="", filename="", lo=0, hi=-1, lines=lines
+                )
+            words = await db.words(
+                opts, filetype=None, word="w", sym="", limitless=True, update=None
+            )
+            return sorted(word.text for word in words)
+
+        for backend in (BDB, MemoryBDB):
+            db = backend(9, unifying_chars=frozenset(), include_syms=False)
+            words = run(cont(db))
+            self.assertEqual(len(words), 60, msg=backend.__name__)
+            self.assertEqual(words, sorted(" ".join(lines).split()))
+
+
+class LineNums(TestCase):
+    def test_1(self) -> None:
+        opts = replace(_OPTS, exact_matches=1, fuzzy_cutoff=0)
+        model = ["w0", "w1"]
+
+        async def cont(db: PBDB) -> Sequence[Tuple[str, int]]:
+            lines = ("w0", "w1")
+            await db.set_lines(1, filetype="", filename="", lo=0, hi=0, lines=lines)
+            for idx in range(2, 99):
+                await db.set_lines(
+                    1, filetype="", filename="", lo=1, hi=1, lines=(f"w{idx}",)
+                )
+            await db.set_lines(1, filetype="", filename="", lo=9, hi=11, lines=())
+            words = await db.words(
+                opts, filetype=None, word="w", sym="", limitless=True, update=None
+            )
+            return sorted((word.text, word.line_num) for word in words)
+
+        for idx in range(2, 99):
+            model.insert(1, f"w{idx}")
+        del model[9:11]
+        expected = sorted((text, idx) for idx, text in enumerate(model, start=1))
+        for db in _backends():
+            self.assertEqual(run(cont(db)), expected)
+
+
+class BackendsBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        vocab, lines = _corpus(rand, size=500_000)
+        queries = tuple(rand.choice(vocab)[: rand.randint(2, 6)] for _ in range(99))
+        rows = tuple(rand.randrange(len(lines)) for _ in queries)
+
+        async def cont(db: PBDB) -> Tuple[Sequence[float], Sequence[Sequence[str]]]:
+            t0 = perf_counter()
+            for lo in range(0, len(lines), 99):
+                await db.set_lines(
+                    1, filetype="", filename="", lo=lo, hi=lo, lines=lines[lo : lo + 99]
+                )
+            t1 = perf_counter()
+            words = [await _query(db, word=query, sym="") for query in queries]
+            t2 = perf_counter()
+            for row, query in zip(rows, queries):
+                update = Update(
+                    buf_id=1,
+                    filetype="",
+                    filename="",
+                    lo=row,
+                    hi=row + 1,
+                    lines=(f"{lines[row]} {query}",),
+                )
+                await db.words(
+                    _OPTS,
+                    filetype=None,
+                    word=query,
+                    sym="",
+                    limitless=False,
+                    update=update,
+                )
+            t3 = perf_counter()
+            n = len(queries)
+            return (t1 - t0, (t2 - t1) / n, (t3 - t2) / n), words
+
+        (sql_t, sql_words), (mem_t, mem_words) = (run(cont(db)) for db in _backends())
+        self.assertEqual(mem_words, sql_words)
+        for label, unit, sql_s, mem_s in zip(
+            ("insert", "query", "keystroke"), (1, 1000, 1000), sql_t, mem_t
+        ):
+            print(
+                f"{label} {len(lines)} lines :: BDB {sql_s * unit:.2f} -> "
+                f"MemoryBDB {mem_s * unit:.2f} {'s' if unit == 1 else 'ms'}",
+                file=stderr,
+            )
@@ -0,0 +1,92 @@
+from asyncio import run
+from contextlib import closing
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from typing import Mapping, Sequence, Tuple
+from unittest import TestCase
+
+from ...coq.databases.frecency.database import _HALF_LIFE, _SIZE, FDB, _init
+from ...coq.databases.frecency.sql import sql
+
+
+def _seed(vars_dir: Path, rows: Sequence[Tuple[str, float, float]]) -> None:
+    with closing(_init(vars_dir / "frecency")) as conn:
+        with conn, closing(conn.cursor()) as cursor:
+            cursor.executemany(
+                sql("insert", "frecency"),
+                (
+                    {"sort_by": sort_by, "score": score, "mtime": mtime}
+                    for sort_by, score, mtime in rows
+                ),
+            )
+
+
+def _persisted(vars_dir: Path) -> Sequence[str]:
+    with closing(_init(vars_dir / "frecency")) as conn:
+        with conn, closing(conn.cursor()) as cursor:
+            cursor.execute(sql("select", "frecency"), ())
+            return sorted(row["sort_by"] for row in cursor.fetchall())
+
+
+async def _scores(vars_dir: Path, bumps: Sequence[str] = ()) -> Mapping[str, float]:
+    fdb = FDB(vars_dir)
+    for sort_by in bumps:
+        await fdb.bump(sort_by)
+    await fdb._loaded
+    return fdb.scores()
+
+
+class Decay(TestCase):
+    def test_1(self) -> None:
+        now = time()
+        rows = (("new", 1, now), ("old", 1, now - _HALF_LIFE))
+        with TemporaryDirectory() as tmp:
+            _seed(Path(tmp), rows=rows)
+            scores = run(_scores(Path(tmp)))
+        self.assertAlmostEqual(scores["old"] / scores["new"], 0.5)
+
+    def test_2(self) -> None:
+        with TemporaryDirectory() as tmp:
+            scores = run(_scores(Path(tmp), bumps=("a", "b", "a")))
+            self.assertAlmostEqual(scores["a"] / scores["b"], 2, places=3)
+
+            scores = run(_scores(Path(tmp)))
+            self.assertAlmostEqual(scores["a"] / scores["b"], 2, places=3)
+
+    def test_3(self) -> None:
+        with TemporaryDirectory() as tmp:
+
+            async def cont() -> None:
+                fdb = FDB(Path(tmp))
+                await fdb.bump("a")
+                scores = fdb.scores()
+                await fdb.bump("a")
+                await fdb.bump("b")
+                self.assertEqual(scores.keys(), {"a"})
+                self.assertLess(scores["a"], fdb.scores()["a"])
+
+            run(cont())
+
+
+class Compaction(TestCase):
+    def test_1(self) -> None:
+        now = time()
+        rows = (("alive", 1, now), ("dead", 1, now - 11 * _HALF_LIFE))
+        with TemporaryDirectory() as tmp:
+            _seed(Path(tmp), rows=rows)
+            scores = run(_scores(Path(tmp)))
+            persisted = _persisted(Path(tmp))
+        self.assertEqual(scores.keys(), {"alive"})
+        self.assertEqual(persisted, ["alive"])
+
+    def test_2(self) -> None:
+        now = time()
+        rows = tuple((str(idx), idx + 1, now) for idx in range(_SIZE + 9))
+        with TemporaryDirectory() as tmp:
+            _seed(Path(tmp), rows=rows)
+            scores = run(_scores(Path(tmp)))
+            persisted = _persisted(Path(tmp))
+        survivors = sorted(str(idx) for idx in range(9, _SIZE + 9))
+        self.assertEqual(sorted(scores), survivors)
+        self.assertEqual(persisted, survivors)
@@ -0,0 +1,83 @@
+from asyncio import run
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Mapping, Sequence, Tuple
+from unittest import TestCase
+from uuid import uuid4
+
+from ...coq.databases.frecency.database import FDB
+from ...coq.databases.insertions.database import IDB, Statistics
+from ...coq.shared.runtime import Latency
+
+
+async def _record(
+    idb: IDB, source: str, duration: float, interrupted: bool, truncated: bool
+) -> None:
+    batch_id, instance = uuid4().bytes, uuid4().bytes
+    await idb.new_batch(batch_id)
+    await idb.new_instance(instance, source=source, batch_id=batch_id)
+    await idb.new_stat(
+        instance,
+        interrupted=interrupted,
+        truncated=truncated,
+        duration=duration,
+        items=0,
+    )
+
+
+async def _latencies(
+    vars_dir: Path, durations: Mapping[str, Sequence[float]]
+) -> Mapping[str, Latency]:
+    idb = IDB(FDB(vars_dir))
+    for source, seq in durations.items():
+        await idb.new_source(source)
+        for duration in seq:
+            await _record(
+                idb, source, duration=duration, interrupted=False, truncated=False
+            )
+    return await idb.latencies()
+
+
+async def _stats(
+    vars_dir: Path, runs: Mapping[str, Sequence[Tuple[bool, bool]]]
+) -> Mapping[str, Statistics]:
+    idb = IDB(FDB(vars_dir))
+    for source, seq in runs.items():
+        await idb.new_source(source)
+        for interrupted, truncated in seq:
+            await _record(
+                idb, source, duration=1, interrupted=interrupted, truncated=truncated
+            )
+    return {stat.source: stat for stat in await idb.stats()}
+
+
+class Latencies(TestCase):
+    def test_1(self) -> None:
+        durations = {"a": [*range(20, 0, -1)], "b": [*range(5)]}
+        with TemporaryDirectory() as tmp:
+            latencies = run(_latencies(Path(tmp), durations=durations))
+        self.assertEqual(latencies, {"a": Latency(q50_duration=11, q95_duration=20)})
+
+    def test_2(self) -> None:
+        durations = {"a": [*(99.0 for _ in range(99)), *(1.0 for _ in range(99))]}
+        with TemporaryDirectory() as tmp:
+            latencies = run(_latencies(Path(tmp), durations=durations))
+        self.assertEqual(latencies, {"a": Latency(q50_duration=1, q95_duration=1)})
+
+
+class Truncated(TestCase):
+    def test_1(self) -> None:
+        runs = {
+            "a": [(False, True), (False, False), (True, False), (False, True)],
+            "b": [(False, False)],
+            "c": [],
+        }
+        with TemporaryDirectory() as tmp:
+            stats = run(_stats(Path(tmp), runs=runs))
+        self.assertEqual(
+            {
+                source: (stat.interrupted, stat.truncated)
+                for source, stat in stats.items()
+            },
+            {"a": (1, 2), "b": (0, 0), "c": (0, 0)},
+        )
@@ -0,0 +1,97 @@
+from contextlib import closing
+from sqlite3 import Connection, IntegrityError, Row
+from typing import AbstractSet, Iterable
+from unittest import TestCase
+
+from ...coq.databases.ngrams.index import NGramIndex, init_ngrams, ngrams
+from ...coq.shared.settings import MatchOptions
+
+
+def _opts(fuzzy_cutoff: float) -> MatchOptions:
+    return MatchOptions(
+        max_results=33,
+        unifying_chars=frozenset(),
+        exact_matches=2,
+        look_ahead=2,
+        fuzzy_cutoff=fuzzy_cutoff,
+    )
+
+
+def _conn() -> Connection:
+    conn = Connection(":memory:", isolation_level=None)
+    conn.row_factory = Row
+    init_ngrams(conn)
+    return conn
+
+
+class NGrams(TestCase):
+    def test_1(self) -> None:
+        self.assertEqual(ngrams(""), set())
+
+    def test_2(self) -> None:
+        self.assertEqual(ngrams("a"), set())
+
+    def test_3(self) -> None:
+        self.assertEqual(ngrams("aBab"), {"ab", "ba"})
+
+    def test_4(self) -> None:
+        self.assertEqual(ngrams("ÄB"), {"Äb"})
+
+
+class Index(TestCase):
+    def _hits(
+        self, words: Iterable[str], query: str, fuzzy_cutoff: float
+    ) -> AbstractSet[str]:
+        index = NGramIndex()
+        with closing(_conn()) as conn, closing(conn.cursor()) as cursor:
+            index.index(cursor, words=words)
+            index.hits(cursor, opts=_opts(fuzzy_cutoff), word=query, sym="")
+            cursor.execute("SELECT lword FROM ngram_hits")
+            return {row["lword"] for row in cursor.fetchall()}
+
+    def test_1(self) -> None:
+        words = ("fooBar", "xFooBar", "zzzz")
+        hits = self._hits(words, query="foobar", fuzzy_cutoff=0.6)
+        self.assertEqual(hits, {"foobar", "xfoobar"})
+
+    def test_2(self) -> None:
+        hits = self._hits(("fooBar",), query="fo", fuzzy_cutoff=0.6)
+        self.assertEqual(hits, set())
+
+    def test_3(self) -> None:
+        hits = self._hits(("abcdef",), query="abxxef", fuzzy_cutoff=0.6)
+        self.assertEqual(hits, set())
+        hits = self._hits(("abcdef",), query="abxxef", fuzzy_cutoff=0.3)
+        self.assertEqual(hits, {"abcdef"})
+
+    def test_4(self) -> None:
+        index = NGramIndex()
+        with closing(_conn()) as conn, closing(conn.cursor()) as cursor:
+            cursor.execute("CREATE TABLE words (lword TEXT NOT NULL)")
+            cursor.execute("CREATE VIEW ngram_lwords AS SELECT lword FROM words")
+            index.index(cursor, words=("abc", "bcd"))
+            cursor.execute("INSERT INTO words (lword) VALUES ('abc')")
+            index.prune(cursor)
+            cursor.execute("SELECT DISTINCT lword FROM ngrams")
+            self.assertEqual({row["lword"] for row in cursor.fetchall()}, {"abc"})
+
+    def test_5(self) -> None:
+        index = NGramIndex()
+        with closing(_conn()) as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(
+                """
+                CREATE TRIGGER fail BEFORE INSERT ON ngrams
+                WHEN new.lword = 'bcd'
+                BEGIN
+                  SELECT RAISE(ABORT, 'fail');
+                END
+                """
+            )
+            with self.assertRaises(IntegrityError):
+                index.index(cursor, words=("abc", "bcd"))
+            cursor.execute("DROP TRIGGER fail")
+            index.index(cursor, words=("abc", "bcd"))
+            cursor.execute("SELECT DISTINCT lword FROM ngrams")
+            self.assertEqual(
+                {row["lword"] for row in cursor.fetchall()}, {"abc", "bcd"}
+            )
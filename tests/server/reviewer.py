@@ -1,7 +1,17 @@
+from dataclasses import replace
 from random import uniform
 from unittest import TestCase
 
-from ...coq.server.reviewer import sigmoid
+from ...coq.server.reviewer import _Proximity, _refinable, sigmoid
+from ...coq.shared.settings import MatchOptions
+
+_OPTS = MatchOptions(
+    max_results=33,
+    unifying_chars=frozenset(),
+    exact_matches=2,
+    look_ahead=2,
+    fuzzy_cutoff=0.6,
+)
 
 
 class Sigmoid(TestCase):
@@ -13,3 +23,34 @@ class Sigmoid(TestCase):
         for _ in range(0, 10000):
             y = sigmoid(uniform(-10, 10))
             self.assertTrue(y >= 0.5 and y <= 1.5)
+
+
+class Refinable(TestCase):
+    def test_1(self) -> None:
+        self.assertTrue(_refinable(_OPTS, sort_by="supervisor", cword="sup"))
+
+    def test_2(self) -> None:
+        self.assertFalse(_refinable(_OPTS, sort_by="sup", cword="sup"))
+
+    def test_3(self) -> None:
+        self.assertFalse(_refinable(_OPTS, sort_by="su", cword="sup"))
+
+    def test_4(self) -> None:
+        opts = replace(_OPTS, fuzzy_cutoff=0.5)
+        self.assertTrue(_refinable(opts, sort_by="supervisor", cword="upervisor"))
+
+    def test_5(self) -> None:
+        self.assertFalse(_refinable(_OPTS, sort_by="xyzzy", cword="sup"))
+
+
+class Proximity(TestCase):
+    def test_1(self) -> None:
+        proximity = _Proximity()
+        proximity.update(frozenset(), lines=("a b", "b c", "b c"))
+        self.assertEqual(proximity.words, {"a": 1, "b": 3, "c": 2})
+
+    def test_2(self) -> None:
+        proximity = _Proximity()
+        proximity.update(frozenset(), lines=("a b", "b c", "b c"))
+        proximity.update(frozenset(), lines=("b c", "c d"))
+        self.assertEqual(proximity.words, {"b": 1, "c": 2, "d": 1})
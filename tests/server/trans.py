@@ -0,0 +1,146 @@
+from locale import strxfrm
+from os import environ
+from random import Random
+from string import ascii_letters
+from sys import stderr
+from time import perf_counter
+from typing import Any, Callable, Sequence, Tuple
+from unittest import TestCase, skipUnless
+from uuid import uuid4
+
+from ...coq.server.trans import _XFRM, _sort_by, _Xfrm, _XfrmStats
+from ...coq.shared.runtime import MetricBatch
+from ...coq.shared.types import Completion, Edit
+
+
+def _batch(sort_bys: Sequence[str]) -> MetricBatch:
+    comps = tuple(
+        Completion(
+            source="",
+            always_on_top=False,
+            weight_adjust=0,
+            label=sort_by,
+            sort_by=sort_by,
+            primary_edit=Edit(new_text=sort_by),
+            adjust_indent=False,
+            icon_match=None,
+        )
+        for sort_by in sort_bys
+    )
+    zeros = tuple(0 for _ in comps)
+    return MetricBatch(
+        instances=tuple(uuid4() for _ in comps),
+        comps=comps,
+        prefix_matches=zeros,
+        edit_distance=zeros,
+        recency=zeros,
+        proximity=zeros,
+        weight_adjust=zeros,
+        label_width=zeros,
+        kind_width=zeros,
+    )
+
+
+def _corpus(rand: Random, n: int, spread: int) -> Tuple[MetricBatch, Sequence[int]]:
+    sort_bys = tuple(
+        "".join(rand.choice(ascii_letters) for _ in range(rand.randint(1, 9)))
+        for _ in range(n)
+    )
+    scores = tuple(rand.randint(0, spread) for _ in range(n))
+    return _batch(sort_bys), scores
+
+
+def _tuple_keys(batch: MetricBatch, scores: Sequence[int]) -> Callable[[int], Any]:
+    """
+    Every component eagerly, `strxfrm` included
+    """
+
+    def key_by(idx: int) -> Any:
+        comp = batch.comps[idx]
+        return (
+            -(comp.always_on_top),
+            -(comp.preselect),
+            -scores[idx],
+            -len(comp.secondary_edits),
+            -(comp.kind != ""),
+            -(comp.doc is not None),
+            -comp.sort_by[:1].isalnum(),
+            strxfrm(comp.sort_by.swapcase()),
+        )
+
+    return key_by
+
+
+class SortBy(TestCase):
+    def test_1(self) -> None:
+        rand = Random(0)
+        for spread in (0, 9, 999_999):
+            batch, scores = _corpus(rand, n=999, spread=spread)
+            rows = range(len(batch.comps))
+            stats = _XfrmStats()
+            lhs = sorted(rows, key=_sort_by(True, batch, scores=scores, stats=stats))
+            rhs = sorted(rows, key=_tuple_keys(batch, scores=scores))
+            self.assertEqual(
+                [batch.comps[idx].sort_by for idx in lhs],
+                [batch.comps[idx].sort_by for idx in rhs],
+            )
+
+    def test_2(self) -> None:
+        batch = _batch(("a", "b", "c"))
+        stats = _XfrmStats()
+        key_by = _sort_by(True, batch, scores=(1, 2, 3), stats=stats)
+        self.assertEqual(sorted(range(3), key=key_by), [2, 1, 0])
+        self.assertEqual((stats.keys, stats.lookups), (3, 0))
+
+    def test_3(self) -> None:
+        batch = _batch(("b", "a", "c"))
+        stats = _XfrmStats()
+        key_by = _sort_by(True, batch, scores=(1, 1, 0), stats=stats)
+        self.assertEqual(sorted(range(3), key=key_by), [1, 0, 2])
+        self.assertEqual((stats.keys, stats.lookups), (3, 2))
+
+
+class Xfrm(TestCase):
+    def test_1(self) -> None:
+        xfrm, stats = _Xfrm(), _XfrmStats()
+        for text in ("a", "b", "a", "A"):
+            xfrm(text, is_lower=True, stats=stats)
+        self.assertEqual((stats.lookups, stats.hits), (4, 1))
+
+    def test_2(self) -> None:
+        xfrm, stats = _Xfrm(), _XfrmStats()
+        self.assertEqual(xfrm("aB", is_lower=True, stats=stats), strxfrm("Ab"))
+        self.assertEqual(xfrm("aB", is_lower=False, stats=stats), strxfrm("aB"))
+        self.assertEqual(stats.hits, 0)
+
+    def test_3(self) -> None:
+        xfrm, stats = _Xfrm(), _XfrmStats()
+        for _ in range(2):
+            xfrm.refresh()
+            self.assertEqual(xfrm("aB", is_lower=True, stats=stats), strxfrm("Ab"))
+        self.assertEqual(stats.lookups, 2)
+
+
+class SortByBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        for spread in (9, 999_999):
+            batch, scores = _corpus(rand, n=9999, spread=spread)
+            rows = range(len(batch.comps))
+            stats = _XfrmStats()
+
+            t0 = perf_counter()
+            tuples = sorted(rows, key=_tuple_keys(batch, scores=scores))
+            t1 = perf_counter()
+            _XFRM.refresh()
+            lazy = sorted(rows, key=_sort_by(True, batch, scores=scores, stats=stats))
+            t2 = perf_counter()
+
+            print(
+                f"sort {len(rows)} rows, {spread + 1} scores :: "
+                f"tuple keys {(t1 - t0) * 1000:.2f} -> "
+                f"lazy keys {(t2 - t1) * 1000:.2f} ms, {stats}",
+                file=stderr,
+            )
+            self.assertEqual(lazy, tuples)
@@ -0,0 +1,27 @@
+from asyncio import gather, run
+from threading import Event
+from typing import MutableSequence
+from unittest import TestCase
+
+from ...coq.shared.executor import DBExecutor
+
+
+class Lanes(TestCase):
+    def test_1(self) -> None:
+        ex = DBExecutor()
+        gate = Event()
+        order: MutableSequence[str] = []
+
+        async def cont() -> None:
+            blocked = ex.background(gate.wait)
+            work = (
+                ex.background(order.append, "b1"),
+                ex.background(order.append, "b2"),
+                ex.submit(order.append, "i1"),
+                ex.submit(order.append, "i2"),
+            )
+            gate.set()
+            await gather(blocked, *work)
+
+        run(cont())
+        self.assertEqual(order, ["i1", "i2", "b1", "b2"])
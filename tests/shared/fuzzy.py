@@ -1,10 +1,55 @@
-from unittest import TestCase
+from os import environ
+from random import Random
+from sqlite3 import Connection
+from string import ascii_lowercase
+from sys import stderr
+from time import perf_counter
+from timeit import timeit
+from typing import Callable, Sequence, Tuple
+from unittest import TestCase, skipUnless
 
-from ...coq.shared.fuzzy import dl_distance, metrics, multi_set_ratio, quick_ratio
+from ...coq.shared.fuzzy import (
+    bit_distance,
+    bounded_distance,
+    dl_distance,
+    metrics,
+    metrics_batch,
+    multi_set_ratio,
+    profiled_ratio,
+    query_profile,
+    quick_ratio,
+)
 
 _LOOK_AHEAD = 2
 
 
+def _osa(lhs: str, rhs: str) -> int:
+    d = [
+        [i + j if not (i and j) else 0 for j in range(len(rhs) + 1)]
+        for i in range(len(lhs) + 1)
+    ]
+    for i in range(1, len(lhs) + 1):
+        for j in range(1, len(rhs) + 1):
+            cost = lhs[i - 1] != rhs[j - 1]
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if (
+                i > 1
+                and j > 1
+                and lhs[i - 1] == rhs[j - 2]
+                and lhs[i - 2] == rhs[j - 1]
+            ):
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def _identifiers(rand: Random, n: int) -> Sequence[str]:
+    chars = ascii_lowercase + "_"
+    return tuple(
+        "".join(rand.choice(chars) for _ in range(rand.randint(4, 20)))
+        for _ in range(n)
+    )
+
+
 class MultiSetRatio(TestCase):
     def test_1(self) -> None:
         lhs = ""
@@ -69,6 +114,53 @@ class QuickRatio(TestCase):
         self.assertAlmostEqual(ratio, 1 / 2)
 
 
+class ProfiledRatio(TestCase):
+    def test_1(self) -> None:
+        rand = Random(0)
+        for _ in range(2000):
+            lhs = "".join(rand.choice("abcd") for _ in range(rand.randint(0, 10)))
+            rhs = "".join(rand.choice("abcd") for _ in range(rand.randint(0, 10)))
+            profile = query_profile(lhs)
+            self.assertEqual(
+                profiled_ratio(profile, rhs, look_ahead=_LOOK_AHEAD),
+                quick_ratio(lhs, rhs, look_ahead=_LOOK_AHEAD),
+            )
+
+
+class ProfiledRatioBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        words = _identifiers(rand, n=100000)
+        query = (
+            "SELECT COUNT(*) FROM words"
+            " WHERE X_SIMILARITY(LOWER(:word), lword, 2) > 0.6"
+        )
+
+        def profiled(lhs: str, rhs: str, look_ahead: int) -> float:
+            return profiled_ratio(query_profile(lhs), rhs=rhs, look_ahead=look_ahead)
+
+        def run(func: Callable[[str, str, int], float]) -> Tuple[float, int]:
+            conn = Connection(":memory:")
+            conn.create_function("X_SIMILARITY", narg=3, func=func, deterministic=True)
+            conn.execute("CREATE TABLE words (lword TEXT NOT NULL)")
+            conn.executemany("INSERT INTO words VALUES (?)", ((w,) for w in words))
+            t0 = perf_counter()
+            (count,) = conn.execute(query, {"word": "supervisor"}).fetchone()
+            return perf_counter() - t0, count
+
+        t_plain, c_plain = run(quick_ratio)
+        t_profiled, c_profiled = run(profiled)
+        self.assertEqual(c_plain, c_profiled)
+
+        rows = len(words)
+        print(
+            f"similarity {rows} rows :: quick_ratio {rows / t_plain:.0f} -> "
+            f"profiled_ratio {rows / t_profiled:.0f} rows/s",
+            file=stderr,
+        )
+
+
 class EditD(TestCase):
     def test_1(self) -> None:
         lhs = ""
@@ -125,6 +217,83 @@ class EditD(TestCase):
         self.assertEqual(d, 2)
 
 
+class BitD(TestCase):
+    def test_1(self) -> None:
+        for lhs, rhs, d in (
+            ("", "", 0),
+            ("a", "b", 1),
+            ("", "abc", 3),
+            ("cac", "aca", 2),
+            ("badc", "abcd", 2),
+            ("supervisor", "pervisor", 2),
+        ):
+            self.assertEqual(bit_distance(lhs, rhs), d)
+
+    def test_2(self) -> None:
+        lhs, rhs = "ca", "abc"
+        self.assertEqual(bit_distance(lhs, rhs), _osa(lhs, rhs))
+        self.assertEqual(bit_distance(lhs, rhs), 3)
+
+    def test_3(self) -> None:
+        rand = Random(0)
+        for _ in range(2000):
+            lhs = "".join(rand.choice("abc") for _ in range(rand.randint(0, 9)))
+            rhs = "".join(rand.choice("abc") for _ in range(rand.randint(0, 9)))
+            self.assertEqual(bit_distance(lhs, rhs), _osa(lhs, rhs))
+            self.assertEqual(bit_distance(lhs, rhs), bit_distance(rhs, lhs))
+
+    def test_4(self) -> None:
+        rand = Random(0)
+        words = _identifiers(rand, n=100)
+        for lhs, rhs in zip(words, words[1:]):
+            self.assertGreaterEqual(bit_distance(lhs, rhs), dl_distance(lhs, rhs))
+
+
+class BoundedD(TestCase):
+    def test_1(self) -> None:
+        self.assertEqual(bounded_distance("supervisor", "pervisor", max_d=2), 2)
+        self.assertIsNone(bounded_distance("supervisor", "pervisor", max_d=1))
+        self.assertIsNone(bounded_distance("a", "abcd", max_d=2))
+
+    def test_2(self) -> None:
+        rand = Random(0)
+        for _ in range(2000):
+            lhs = "".join(rand.choice("abc") for _ in range(rand.randint(0, 9)))
+            rhs = "".join(rand.choice("abc") for _ in range(rand.randint(0, 9)))
+            max_d = rand.randint(0, 6)
+            d = bit_distance(lhs, rhs)
+            self.assertEqual(
+                bounded_distance(lhs, rhs, max_d=max_d), d if d <= max_d else None
+            )
+
+    def test_3(self) -> None:
+        rand = Random(0)
+        for _ in range(20):
+            lhs = "".join(rand.choice("abc") for _ in range(rand.randint(65, 80)))
+            rhs = "".join(rand.choice("abc") for _ in range(rand.randint(65, 80)))
+            max_d = rand.randint(0, 40)
+            d = dl_distance(lhs, rhs)
+            self.assertEqual(
+                bounded_distance(lhs, rhs, max_d=max_d), d if d <= max_d else None
+            )
+
+
+class BitDBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        words = _identifiers(rand, n=300)
+        pairs = tuple(zip(words, words[1:]))
+
+        t_list = timeit(lambda: [dl_distance(l, r) for l, r in pairs], number=3)
+        t_bits = timeit(lambda: [bit_distance(l, r) for l, r in pairs], number=3)
+        print(
+            f"distance {len(pairs)} pairs :: dl {t_list * 1000:.2f} -> "
+            f"bits {t_bits * 1000:.2f} ms, {t_list / t_bits:.1f}x",
+            file=stderr,
+        )
+
+
 class Metrics(TestCase):
     def test_1(self) -> None:
         cword = "ab"
@@ -167,3 +336,48 @@ class Metrics(TestCase):
         m = metrics(cword, match, look_ahead=_LOOK_AHEAD)
         self.assertEqual(m.prefix_matches, 0)
         self.assertAlmostEqual(m.edit_distance, 0)
+
+    def test_7(self) -> None:
+        cword = "abcd"
+        match = "abdc"
+        lhs = metrics(cword, match, look_ahead=_LOOK_AHEAD, fuzzy_cutoff=0.6)
+        rhs = metrics(cword, match, look_ahead=_LOOK_AHEAD)
+        self.assertEqual(lhs, rhs)
+
+    def test_8(self) -> None:
+        cword = "abcdef"
+        match = "zyxwvu"
+        m = metrics(cword, match, look_ahead=_LOOK_AHEAD, fuzzy_cutoff=0.6)
+        self.assertEqual(m.prefix_matches, 0)
+        self.assertAlmostEqual(m.edit_distance, 0.5)
+
+    def test_9(self) -> None:
+        rand = Random(0)
+        words = _identifiers(rand, n=999)
+        for cword, other in zip(words, reversed(words)):
+            idx = rand.randint(0, len(cword))
+            match = rand.choice((other, cword[:idx] + other[:2] + cword[idx:]))
+            cword = cword[: rand.randint(1, len(cword))]
+            for fuzzy_cutoff in (0.3, 0.6, 0.9):
+                lhs = metrics(
+                    cword, match, look_ahead=_LOOK_AHEAD, fuzzy_cutoff=fuzzy_cutoff
+                )
+                rhs = metrics(cword, match, look_ahead=_LOOK_AHEAD)
+                if rhs.edit_distance >= fuzzy_cutoff:
+                    self.assertEqual(lhs, rhs)
+                else:
+                    self.assertLessEqual(rhs.edit_distance, lhs.edit_distance)
+                    self.assertLess(lhs.edit_distance, fuzzy_cutoff)
+
+
+class MetricsBatch(TestCase):
+    def test_1(self) -> None:
+        cword = "per"
+        matches = ("supervisor", "per", "pervisor", "", "supervisor", "pre")
+        lhs = metrics_batch(cword, matches, look_ahead=_LOOK_AHEAD)
+        rhs = tuple(metrics(cword, match, look_ahead=_LOOK_AHEAD) for match in matches)
+        self.assertEqual(tuple(lhs), rhs)
+
+    def test_2(self) -> None:
+        m = metrics_batch("ab", (), look_ahead=_LOOK_AHEAD)
+        self.assertEqual(tuple(m), ())
@@ -0,0 +1,365 @@
+from asyncio import get_running_loop, run, sleep
+from dataclasses import replace
+from pathlib import Path
+from time import monotonic
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+from unittest import TestCase
+from uuid import UUID
+
+from ...coq.shared.context import EMPTY_CONTEXT
+from ...coq.shared.runtime import (
+    _PROBE_INTERVAL,
+    _PROBE_TIMEOUT,
+    _SLOW,
+    Latency,
+    MetricBatch,
+    PReviewer,
+    Supervisor,
+    Worker,
+)
+from ...coq.shared.settings import (
+    BaseClient,
+    CompleteOptions,
+    Display,
+    Limits,
+    MatchOptions,
+)
+from ...coq.shared.types import Completion, Context, Edit
+
+_LIMITS = Limits(
+    tokenization_limit=999,
+    idle_timeout=1,
+    completion_auto_timeout=0.1,
+    completion_manual_timeout=1,
+    worker_item_limit=9,
+    worker_time_slice=0.01,
+    download_retries=0,
+    download_timeout=0,
+)
+
+_OPTS = MatchOptions(
+    max_results=33,
+    unifying_chars=frozenset(),
+    exact_matches=2,
+    look_ahead=2,
+    fuzzy_cutoff=0.6,
+)
+
+_COMP = CompleteOptions(
+    always=True,
+    smart=True,
+    replace_prefix_threshold=3,
+    replace_suffix_threshold=0,
+    skip_after=frozenset(),
+    quorum=frozenset(),
+)
+
+
+def _supervisor(reviewer: PReviewer[Any] = cast(PReviewer[Any], None)) -> Supervisor:
+    return Supervisor(
+        vars_dir=Path(),
+        display=cast(Display, None),
+        match=_OPTS,
+        comp=_COMP,
+        limits=_LIMITS,
+        reviewer=reviewer,
+    )
+
+
+class Deadline(TestCase):
+    def test_1(self) -> None:
+        supervisor = _supervisor()
+        self.assertEqual(supervisor._deadline("x", timeout=0.1, now=99), 0.1)
+
+    def test_2(self) -> None:
+        supervisor = _supervisor()
+        supervisor.learn(
+            {
+                "a": Latency(q50_duration=0.005, q95_duration=0.01),
+                "b": Latency(q50_duration=0.02, q95_duration=0.04),
+                "c": Latency(q50_duration=0.05, q95_duration=0.09),
+            }
+        )
+        for name, deadline in (("a", 0.025), ("b", 0.08), ("c", 0.1)):
+            self.assertAlmostEqual(
+                supervisor._deadline(name, timeout=0.1, now=99) or 0, deadline
+            )
+
+    def test_3(self) -> None:
+        supervisor = _supervisor()
+        supervisor.learn(
+            {
+                "slow": Latency(q50_duration=0.2, q95_duration=0.3),
+                "slower": Latency(q50_duration=9, q95_duration=9),
+            }
+        )
+        for name in ("slow", "slower"):
+            self.assertEqual(supervisor._deadline(name, timeout=0.1, now=99), 0)
+
+    def test_4(self) -> None:
+        supervisor = _supervisor()
+        supervisor.learn(
+            {
+                "slow": Latency(q50_duration=0.1 * _SLOW, q95_duration=1),
+                "slower": Latency(q50_duration=9, q95_duration=9),
+            }
+        )
+
+        async def cont() -> None:
+            done = get_running_loop().create_future()
+            done.set_result(None)
+            for name in ("slow", "slower"):
+                supervisor._probes[name] = 99, cast(Any, done)
+            now = 99 + _PROBE_INTERVAL / 2
+            self.assertEqual(supervisor._deadline("slow", timeout=0.1, now=now), 0.1)
+            self.assertIsNone(supervisor._deadline("slower", timeout=0.1, now=now))
+
+            now = 99 + _PROBE_INTERVAL
+            self.assertEqual(supervisor._deadline("slower", timeout=0.1, now=now), 0)
+
+        run(cont())
+
+    def test_5(self) -> None:
+        supervisor = _supervisor()
+        supervisor.learn({"x": Latency(q50_duration=9, q95_duration=9)})
+
+        async def cont() -> None:
+            probe = get_running_loop().create_task(sleep(999))
+            supervisor._probes["x"] = 99, probe
+
+            for now in (99 + _PROBE_INTERVAL, 99 + _PROBE_TIMEOUT):
+                self.assertIsNone(supervisor._deadline("x", timeout=0.1, now=now))
+            self.assertFalse(probe.cancelled())
+
+            now = 99 + _PROBE_TIMEOUT + 1
+            self.assertEqual(supervisor._deadline("x", timeout=0.1, now=now), 0)
+            await sleep(0)
+            self.assertTrue(probe.cancelled())
+
+        run(cont())
+
+
+def _completion(sort_by: str) -> Completion:
+    return Completion(
+        source="",
+        always_on_top=False,
+        weight_adjust=0,
+        label=sort_by,
+        sort_by=sort_by,
+        primary_edit=Edit(new_text=sort_by),
+        adjust_indent=False,
+        icon_match=None,
+    )
+
+
+def _batch(
+    batches: Iterable[Tuple[UUID, Iterable[Completion]]],
+) -> MetricBatch:
+    rows = tuple((instance, comp) for instance, comps in batches for comp in comps)
+    zeros = tuple(0 for _ in rows)
+    return MetricBatch(
+        instances=tuple(instance for instance, _ in rows),
+        comps=tuple(comp for _, comp in rows),
+        prefix_matches=zeros,
+        edit_distance=zeros,
+        recency=zeros,
+        proximity=zeros,
+        weight_adjust=zeros,
+        label_width=zeros,
+        kind_width=zeros,
+    )
+
+
+class _Reviewer(PReviewer[None]):
+    async def register(self, assoc: BaseClient) -> None:
+        pass
+
+    async def begin(self, context: Context) -> None:
+        pass
+
+    async def s_begin(self, token: None, assoc: BaseClient, instance: UUID) -> None:
+        pass
+
+    def trans(
+        self, token: None, batches: Iterable[Tuple[UUID, Iterable[Completion]]]
+    ) -> MetricBatch:
+        return _batch(batches)
+
+    def refine(self, context: Context, batch: MetricBatch) -> MetricBatch:
+        rows = tuple(
+            (instance, comp)
+            for instance, comp in zip(batch.instances, batch.comps)
+            if comp.sort_by.startswith(context.words_before)
+        )
+        return _batch((instance, (comp,)) for instance, comp in rows)
+
+    async def s_end(
+        self,
+        instance: UUID,
+        interrupted: bool,
+        truncated: bool,
+        elapsed: float,
+        items: int,
+    ) -> None:
+        pass
+
+
+class _Worker(Worker[BaseClient, Sequence[str]]):
+    async def work(self, context: Context) -> AsyncIterator[Completion]:
+        for sort_by in self._misc:
+            yield _completion(sort_by)
+
+
+class _Staggered(_Worker):
+    async def work(self, context: Context) -> AsyncIterator[Completion]:
+        # Longer words come later, so none is in unless waited on
+        for sort_by in self._misc:
+            await sleep(_LIMITS.completion_manual_timeout / 9 * len(sort_by))
+            yield _completion(sort_by)
+
+
+class _Busy(Worker[BaseClient, MutableSequence[str]]):
+    async def work(self, context: Context) -> AsyncIterator[Completion]:
+        # Never awaits, each item spins for a whole time slice
+        for _ in range(3):
+            spin = monotonic() + _LIMITS.worker_time_slice
+            while monotonic() < spin:
+                pass
+            self._misc.append("item")
+            yield _completion("")
+
+
+class _Recorder(_Reviewer):
+    def __init__(self) -> None:
+        self.ends: MutableSequence[Tuple[bool, bool, int]] = []
+
+    async def s_end(
+        self,
+        instance: UUID,
+        interrupted: bool,
+        truncated: bool,
+        elapsed: float,
+        items: int,
+    ) -> None:
+        self.ends.append((interrupted, truncated, items))
+
+
+def _context(words_before: str) -> Context:
+    return replace(
+        EMPTY_CONTEXT,
+        manual=False,
+        buf_id=1,
+        position=(0, len(words_before)),
+        line=words_before,
+        line_before=words_before,
+        words=words_before,
+        words_before=words_before,
+    )
+
+
+async def _prefetched(
+    words: Sequence[str], prefetch: str, typed: str
+) -> Tuple[Supervisor, Optional[MetricBatch]]:
+    supervisor = _supervisor(reviewer=_Reviewer())
+    options = BaseClient(enabled=True, short_name="w", weight_adjust=0)
+    # Held here, the supervisor only keeps weak references to its workers
+    worker = _Worker(supervisor, options=options, misc=words)
+    await sleep(0)
+    await supervisor.prefetch(_context(prefetch))
+    # Only the prefetch cache, not the last collect, may serve the refine
+    supervisor._last = None
+    refined = supervisor.refine(_context(typed))
+    assert worker
+    return supervisor, refined
+
+
+class Prefetch(TestCase):
+    def test_1(self) -> None:
+        words = ("abc", "abd", "xyz")
+        supervisor, refined = run(_prefetched(words, prefetch="a", typed="ab"))
+        self.assertEqual(len(supervisor._prefetched), 1)
+        assert refined
+        self.assertEqual([comp.sort_by for comp in refined.comps], ["abc", "abd"])
+
+    def test_2(self) -> None:
+        supervisor, refined = run(_prefetched((), prefetch="a", typed="ab"))
+        self.assertEqual(len(supervisor._prefetched), 0)
+        self.assertIsNone(refined)
+
+    def test_3(self) -> None:
+        words = ("abc", "xyz")
+        _, refined = run(_prefetched(words, prefetch="a", typed="x"))
+        self.assertIsNone(refined)
+
+
+class Collect(TestCase):
+    def test_1(self) -> None:
+        async def cont() -> MetricBatch:
+            supervisor = _supervisor(reviewer=_Reviewer())
+            options = BaseClient(enabled=True, short_name="w", weight_adjust=0)
+            workers = tuple(
+                _Staggered(supervisor, options=options, misc=(sort_by,))
+                for sort_by in ("a", "bb", "ccc")
+            )
+            await sleep(0)
+            batch = await supervisor.collect(replace(_context(""), manual=True))
+            assert workers
+            return batch
+
+        batch = run(cont())
+        self.assertEqual(
+            sorted(comp.sort_by for comp in batch.comps), ["a", "bb", "ccc"]
+        )
+
+
+async def _supervised(
+    worker_t: type, misc: Any
+) -> Tuple[_Recorder, Sequence[Completion]]:
+    recorder = _Recorder()
+    supervisor = _supervisor(reviewer=recorder)
+    options = BaseClient(enabled=True, short_name="w", weight_adjust=0)
+    worker = worker_t(supervisor, options=options, misc=misc)
+    acc: MutableSequence[Tuple[UUID, Sequence[Completion]]] = []
+    await worker.supervised(_context(""), token=None, now=monotonic(), acc=acc)
+    return recorder, [comp for _, comps in acc for comp in comps]
+
+
+class Supervised(TestCase):
+    def test_1(self) -> None:
+        words = tuple(str(idx) for idx in range(_LIMITS.worker_item_limit * 2))
+        recorder, comps = run(_supervised(_Worker, misc=words))
+        self.assertEqual(len(comps), _LIMITS.worker_item_limit)
+        self.assertEqual(recorder.ends, [(False, True, _LIMITS.worker_item_limit)])
+
+    def test_2(self) -> None:
+        words = tuple(str(idx) for idx in range(_LIMITS.worker_item_limit - 1))
+        recorder, comps = run(_supervised(_Worker, misc=words))
+        self.assertEqual(len(comps), len(words))
+        self.assertEqual(recorder.ends, [(False, False, len(words))])
+
+    def test_3(self) -> None:
+        events: MutableSequence[str] = []
+
+        async def cont() -> None:
+            async def tick() -> None:
+                while True:
+                    events.append("tick")
+                    await sleep(0)
+
+            ticker = get_running_loop().create_task(tick())
+            await _supervised(_Busy, misc=events)
+            ticker.cancel()
+
+        run(cont())
+        # Without time slices the busy worker never lets the ticker in between
+        first, last = events.index("item"), len(events) - events[::-1].index("item")
+        self.assertIn("tick", events[first:last])
@@ -1,8 +1,12 @@
 from itertools import accumulate, islice
-from random import randint
-from unittest import TestCase
+from os import environ
+from random import Random, randint
+from sys import stderr
+from timeit import timeit
+from typing import Tuple
+from unittest import TestCase, skipUnless
 
-from ...coq.shared.trans import reverse_acc, trans
+from ...coq.shared.trans import lazy_sorted, reverse_acc, trans
 
 _MIN_MATCH_LEN = 2
 
@@ -157,3 +161,50 @@ class Trans(TestCase):
         )
         self.assertEquals((actual.old_prefix, actual.old_suffix), old_fixes)
         self.assertEquals(actual.new_prefix, new_prefix)
+
+
+class LazySorted(TestCase):
+    def test_1(self) -> None:
+        self.assertEqual(tuple(lazy_sorted((), key=lambda x: x)), ())
+
+    def test_2(self) -> None:
+        rand = Random(0)
+        for _ in range(100):
+            seq = [(rand.randint(0, 3), rand.randint(0, 9)) for _ in range(50)]
+            lhs = tuple(lazy_sorted(seq, key=lambda x: x[0]))
+            rhs = tuple(sorted(seq, key=lambda x: x[0]))
+            self.assertEqual(lhs, rhs)
+
+    def test_3(self) -> None:
+        rand = Random(0)
+        seq = [
+            (-rand.randint(0, 3), -rand.randint(0, 9999), str(rand.random()))
+            for _ in range(10000)
+        ]
+        lhs = tuple(islice(lazy_sorted(seq, key=lambda x: x), 34))
+        rhs = tuple(islice(sorted(seq, key=lambda x: x), 34))
+        self.assertEqual(lhs, rhs)
+
+
+class LazySortedBench(TestCase):
+    @skipUnless("COQ_BENCH" in environ, "set COQ_BENCH to run benchmarks")
+    def test_1(self) -> None:
+        rand = Random(0)
+        k, number = 34, 20
+        seq = [
+            (-rand.randint(0, 3), -rand.randint(0, 9999), str(rand.random()))
+            for _ in range(10000)
+        ]
+
+        def key(x: Tuple[int, int, str]) -> Tuple[int, int, str]:
+            return x
+
+        t_lazy = timeit(
+            lambda: tuple(islice(lazy_sorted(seq, key=key), k)), number=number
+        )
+        t_sorted = timeit(lambda: tuple(islice(sorted(seq, key=key), k)), number=number)
+        print(
+            f"top {k} of {len(seq)} :: sorted {t_sorted / number * 1000:.2f} -> "
+            f"lazy_sorted {t_lazy / number * 1000:.2f} ms",
+            file=stderr,
+        )
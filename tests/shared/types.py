@@ -0,0 +1,27 @@
+from dataclasses import fields, replace
+from sys import version_info
+from unittest import TestCase, skipUnless
+
+from ...coq.shared.runtime import Metric
+from ...coq.shared.types import Completion, Edit
+
+
+class Slots(TestCase):
+    @skipUnless(version_info >= (3, 10), "slots=")
+    def test_1(self) -> None:
+        for cls in (Completion, Metric):
+            self.assertEqual(cls.__slots__, tuple(f.name for f in fields(cls)))
+            self.assertFalse(hasattr(cls.__new__(cls), "__dict__"))
+
+    def test_2(self) -> None:
+        comp = Completion(
+            source="",
+            always_on_top=False,
+            weight_adjust=0,
+            label="label",
+            sort_by="label",
+            primary_edit=Edit(new_text="label"),
+            adjust_indent=False,
+            icon_match=None,
+        )
+        self.assertEqual(replace(comp, label="x").uid, comp.uid)
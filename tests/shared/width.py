@@ -0,0 +1,19 @@
+from unittest import TestCase
+
+from pynvim_pp.lib import display_width as _display_width
+
+from ...coq.shared.width import display_width
+
+
+class DisplayWidth(TestCase):
+    def test_1(self) -> None:
+        for text in ("", "abc", "a b~", "_x__init__()"):
+            self.assertEqual(display_width(text, tabsize=4), len(text))
+
+    def test_2(self) -> None:
+        for text in ("\tx", "日本語", "󰉿 Text", "é"):
+            for tabsize in (2, 4, 8):
+                self.assertEqual(
+                    display_width(text, tabsize=tabsize),
+                    _display_width(text, tabsize=tabsize),
+                )